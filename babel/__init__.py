@@ -26,14 +26,36 @@ This package is basically composed of two major parts:
 :see: http://www.unicode.org/cldr/
 """
 
+import sys
+from types import ModuleType
+
 from babel.core import *
 
 __docformat__ = 'restructuredtext en'
-try:
-    from pkg_resources import get_distribution, ResolutionError
-    try:
-        __version__ = get_distribution('Babel').version
-    except ResolutionError:
-        __version__ = None # unknown
-except ImportError:
-    __version__ = None # unknown
+
+
+class _Package(ModuleType):
+    """Type of the `babel` package module, which looks up the version of the
+    installed distribution when the ``__version__`` attribute is first
+    accessed, as that requires importing ``pkg_resources``.
+    """
+
+    def __getattr__(self, name):
+        if name != '__version__':
+            raise AttributeError(name)
+        try:
+            from pkg_resources import get_distribution, ResolutionError
+            try:
+                version = get_distribution('Babel').version
+            except ResolutionError:
+                version = None # unknown
+        except ImportError:
+            version = None # unknown
+        self.__version__ = version
+        return version
+
+_package = _Package(__name__, __doc__)
+_package.__dict__.update(globals())
+# keep the original module alive, as its globals are used by `_Package`
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
@@ -17,12 +17,19 @@ import os
 import cPickle as pickle
 
 from babel import localedata
+from babel.localedata import ReadOnlyDict
+from babel.compat import threading
+from babel.util import LRUCache, missing
 
-__all__ = ['UnknownLocaleError', 'Locale', 'default_locale', 'negotiate_locale',
-           'parse_locale']
+__all__ = ['UnknownLocaleError', 'Locale', 'LocaleNegotiator', 'default_locale',
+           'negotiate_locale', 'parse_accept_language', 'parse_locale']
 __docformat__ = 'restructuredtext en'
 
 _global_data = None
+_global_lock = threading.Lock()
+_global_filename = os.path.join(os.path.dirname(__file__), 'global.dat')
+_locales = LRUCache() # the shared `Locale` instances returned by `parse`
+_negotiators = LRUCache(maxsize=20) # used by `Locale.from_accept_language`
 
 def get_global(key):
     """Return the dictionary for the given key in the global data.
@@ -35,21 +42,50 @@ def get_global(key):
     >>> get_global('zone_territories')['Europe/Berlin']
     'DE'
     
+    The global data is loaded only once, and every key is only decoded when
+    it is first requested. This function can safely be called from multiple
+    threads.
+    
     :param key: the data key
     :return: the dictionary found in the global data under the given key
     :rtype: `dict`
     :since: version 0.9
     """
+    return _get_global_data().get(key, {})
+
+
+def _get_global_data():
+    """Return the global data dictionary, loading it on first use.
+    
+    The global data is written as a locale data archive, so that its keys can
+    be decoded separately (see `babel.localedata.Archive`). Older versions
+    wrote a single pickle, which is still supported.
+    """
     global _global_data
     if _global_data is None:
-        dirname = os.path.join(os.path.dirname(__file__))
-        filename = os.path.join(dirname, 'global.dat')
-        fileobj = open(filename, 'rb')
+        _global_lock.acquire()
         try:
-            _global_data = pickle.load(fileobj)
+            if _global_data is None:
+                filename = _global_filename
+                try:
+                    archive = localedata.Archive(filename)
+                except IOError:
+                    archive = None
+                if archive is not None:
+                    data = localedata.LazyData()
+                    for key in archive.sections('global'):
+                        data[key] = localedata.LazySection(archive, 'global',
+                                                           key)
+                else:
+                    fileobj = open(filename, 'rb')
+                    try:
+                        data = localedata.intern_strings(pickle.load(fileobj))
+                    finally:
+                        fileobj.close()
+                _global_data = data
         finally:
-            fileobj.close()
-    return _global_data.get(key, {})
+            _global_lock.release()
+    return _global_data
 
 
 LOCALE_ALIASES = {
@@ -107,10 +143,33 @@ class Locale(object):
         ...
     UnknownLocaleError: unknown locale 'en_DE'
     
+    `Locale` objects are immutable, and compare and hash by their identifier,
+    so they can be used as dictionary keys:
+    
+    >>> {Locale('en', 'US'): 1}[Locale.parse('en_US')]
+    1
+    >>> locale.territory = 'GB'
+    Traceback (most recent call last):
+        ...
+    AttributeError: can't set attribute
+    
+    The locale data is shared by all `Locale` objects for the same locale, so
+    the dictionaries returned by the properties can not be modified either;
+    use their ``copy()`` method to get a dictionary that can:
+    
+    >>> locale.number_symbols['decimal'] = u','
+    Traceback (most recent call last):
+        ...
+    TypeError: locale data can not be modified
+    
     :see: `IETF RFC 3066 <http://www.ietf.org/rfc/rfc3066.txt>`_
     """
+    __slots__ = ('_language', '_territory', '_script', '_variant',
+                 '_identifier', '_hash', '__sections', '__data', '__compiled',
+                 '__weakref__')
 
-    def __init__(self, language, territory=None, script=None, variant=None):
+    def __init__(self, language, territory=None, script=None, variant=None,
+                 sections=None):
         """Initialize the locale object from the given identifier components.
         
         >>> locale = Locale('en', 'US')
@@ -119,20 +178,35 @@ class Locale(object):
         >>> locale.territory
         'US'
         
+        If only some of the locale data is going to be used, the `sections`
+        parameter can be used to load only that data up front; other data is
+        loaded when it is first accessed:
+        
+        >>> locale = Locale('en', 'US', sections=['number_symbols'])
+        >>> locale.number_symbols['decimal']
+        u'.'
+        
         :param language: the language code
         :param territory: the territory (country or region) code
         :param script: the script code
         :param variant: the variant code
+        :param sections: the keys of the top-level sections of the locale data
+                         to load, or `None` to load all sections
         :raise `UnknownLocaleError`: if no locale data is available for the
                                      requested locale
         """
-        self.language = language
-        self.territory = territory
-        self.script = script
-        self.variant = variant
+        self._language = language
+        self._territory = territory
+        self._script = script
+        self._variant = variant
+        self._identifier = identifier = intern(str('_'.join(filter(None, [
+            language, script, territory, variant
+        ]))))
+        self._hash = hash(identifier)
+        self.__sections = sections
         self.__data = None
+        self.__compiled = None
 
-        identifier = str(self)
         if not localedata.exists(identifier):
             raise UnknownLocaleError(identifier)
 
@@ -185,7 +259,61 @@ class Locale(object):
             return Locale.parse(identifier, sep=sep)
     negotiate = classmethod(negotiate)
 
-    def parse(cls, identifier, sep='_'):
+    def from_accept_language(cls, header, available, sep='_',
+                             aliases=LOCALE_ALIASES):
+        """Find the best match between available locale strings and the
+        languages requested by an HTTP ``Accept-Language`` header.
+        
+        >>> Locale.from_accept_language('de-CH, de;q=0.8, en;q=0.5',
+        ...                             ['de_DE', 'en_US'])
+        <Locale "de_DE">
+        >>> Locale.from_accept_language('fr, en-GB;q=0.5', ['en', 'it'])
+        <Locale "en">
+        >>> Locale.from_accept_language('fr, *;q=0.1', ['en', 'it'])
+        <Locale "en">
+        >>> Locale.from_accept_language('fr', ['en', 'it'])
+        
+        The languages are tried in the order of their quality values, using
+        the same rules as `negotiate`. A wildcard matches the first available
+        locale that has not been excluded with a quality of zero, either
+        directly or through its language.
+        
+        The results for recently seen headers are remembered, so that most
+        requests can be negotiated with a single dictionary lookup. To avoid
+        rebuilding the index of available locales, a `LocaleNegotiator` can
+        also be passed instead of the list of identifiers.
+        
+        :param header: the value of the ``Accept-Language`` header
+        :param available: the list of locale identifiers available, or a
+                          `LocaleNegotiator` for them
+        :param sep: character that separates the different parts of the
+                    available locale identifiers
+        :param aliases: a dictionary of aliases for locale identifiers
+        :return: the `Locale` object for the best match, or `None` if no match
+                 was found
+        :rtype: `Locale`
+        :see: `parse_accept_language`
+        """
+        negotiator = available
+        if not isinstance(negotiator, LocaleNegotiator):
+            available = tuple(available)
+            if aliases is LOCALE_ALIASES:
+                key = (available, sep, False)
+            elif aliases:
+                key = (available, sep, tuple(sorted(aliases.items())))
+            else:
+                key = (available, sep, True)
+            negotiator = _negotiators.get(key)
+            if negotiator is None:
+                negotiator = LocaleNegotiator(available, sep=sep,
+                                              aliases=aliases)
+                _negotiators[key] = negotiator
+        identifier = negotiator.negotiate_header(header)
+        if identifier:
+            return cls.parse(identifier, sep=negotiator.sep)
+    from_accept_language = classmethod(from_accept_language)
+
+    def parse(cls, identifier, sep='_', sections=None):
         """Create a `Locale` instance for the given locale identifier.
         
         >>> l = Locale.parse('de-DE', sep='-')
@@ -198,8 +326,23 @@ class Locale(object):
         >>> Locale.parse(l)
         <Locale "de_DE">
         
+        The instances created for locale identifier strings are kept in a
+        registry and shared, so that the locale data they have loaded is
+        reused by later calls:
+        
+        >>> Locale.parse('de_DE') is Locale.parse('de-DE', sep='-') is l
+        True
+        
+        The size of the registry can be limited with
+        `set_locale_registry_limit`. The shared instances don't keep their
+        locale data in memory once it has been evicted from the locale data
+        cache (see `localedata.set_cache_limits`); it is loaded again when it
+        is needed.
+        
         :param identifier: the locale identifier string
         :param sep: optional component separator
+        :param sections: the keys of the top-level sections of the locale data
+                         to load, or `None` to load all sections
         :return: a corresponding `Locale` instance
         :rtype: `Locale`
         :raise `ValueError`: if the string does not appear to be a valid locale
@@ -209,29 +352,159 @@ class Locale(object):
         :see: `parse_locale`
         """
         if isinstance(identifier, basestring):
-            return cls(*parse_locale(identifier, sep=sep))
+            key = (cls, identifier, sep)
+            locale = _locales.get(key)
+            if locale is None:
+                locale = cls(sections=sections,
+                             *parse_locale(identifier, sep=sep))
+                # Use the same instance for all spellings of the identifier
+                locale = _locales.setdefault((cls, str(locale), '_'), locale)
+                _locales[key] = locale
+            return locale
         return identifier
     parse = classmethod(parse)
 
+    def preload(cls, locales, sections=None, sep='_'):
+        """Load the data of the given locales, as well as the global data, up
+        front.
+        
+        This is intended to be called by servers before they fork worker
+        processes, so that the workers share the data instead of each loading
+        it on first use:
+        
+        >>> Locale.preload(['de-DE', 'fr-CH'], sep='-')
+        [<Locale "de_DE">, <Locale "fr_CH">]
+        
+        :param locales: an iterable of locale identifier strings or `Locale`
+                        objects
+        :param sections: the keys of the top-level sections of the locale data
+                         to preload, or `None` to preload all sections
+        :param sep: optional component separator
+        :return: the `Locale` objects for the given locales
+        :rtype: `list`
+        :raise `ValueError`: if one of the strings does not appear to be a
+                             valid locale identifier
+        :raise `UnknownLocaleError`: if no locale data is available for one
+                                     of the requested locales
+        :see: `babel.localedata.preload`
+        """
+        locales = [cls.parse(locale, sep=sep) for locale in locales]
+        localedata.preload([str(locale) for locale in locales],
+                           sections=sections)
+        get_global('zone_aliases')
+        return locales
+    preload = classmethod(preload)
+
     def __eq__(self, other):
-        return str(self) == str(other)
+        if isinstance(other, Locale):
+            return self._identifier == other._identifier
+        return self._identifier == str(other)
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), (self._language, self._territory, self._script,
+                             self._variant))
+
+    def __setstate__(self, state):
+        # Only called for objects pickled by versions before 1.0, which kept
+        # the identifier components (and the loaded locale data) in the
+        # instance dictionary
+        self.__init__(state['language'], state.get('territory'),
+                      state.get('script'), state.get('variant'))
+
     def __repr__(self):
-        return '<Locale "%s">' % str(self)
+        return '<Locale "%s">' % self._identifier
 
     def __str__(self):
-        return '_'.join(filter(None, [self.language, self.script,
-                                      self.territory, self.variant]))
+        return self._identifier
+
+    def language(self):
+        return self._language
+    language = property(language, doc="""\
+        The language code.
+        
+        >>> Locale('de', 'DE').language
+        'de'
+        
+        :type: `str`
+        """)
+
+    def territory(self):
+        return self._territory
+    territory = property(territory, doc="""\
+        The territory (country or region) code, or `None`.
+        
+        >>> Locale('de', 'DE').territory
+        'DE'
+        
+        :type: `str`
+        """)
+
+    def script(self):
+        return self._script
+    script = property(script, doc="""\
+        The script code, or `None`.
+        
+        >>> Locale('sr', 'BA', 'Latn').script
+        'Latn'
+        
+        :type: `str`
+        """)
+
+    def variant(self):
+        return self._variant
+    variant = property(variant, doc="""\
+        The variant code, or `None`.
+        
+        :type: `str`
+        """)
 
     def _data(self):
-        if self.__data is None:
-            self.__data = localedata.LocaleDataDict(localedata.load(str(self)))
-        return self.__data
+        data = self.__data
+        if data is None:
+            data = self.__data = localedata.load_resolved(
+                str(self), sections=self.__sections)
+        return data
     _data = property(_data)
 
+    def _uncache(self):
+        # Forget the locale data, so that the memory can be released when it
+        # is evicted from the locale data cache; it is loaded again when it
+        # is needed
+        self.__data = None
+        self.__compiled = None
+
+    def compile(self):
+        """Return a snapshot of the locale data used for formatting dates,
+        times and numbers.
+        
+        >>> compiled = Locale('de', 'DE').compile()
+        >>> compiled.decimal_symbol
+        u','
+        >>> compiled.months['format', 'wide'][1]
+        u'Januar'
+        
+        The snapshot is created when this method is first called, and then
+        returned for every later call on the same instance. As `parse` returns
+        shared instances, the snapshot is usually only created once for every
+        locale:
+        
+        >>> Locale.parse('de_DE').compile() is Locale.parse('de_DE').compile()
+        True
+        
+        :return: the compiled locale data
+        :rtype: `CompiledLocale`
+        """
+        compiled = self.__compiled
+        if compiled is None:
+            compiled = self.__compiled = CompiledLocale(self)
+        return compiled
+
     def get_display_name(self, locale=None):
         """Return the display name of the locale using the given locale.
         
@@ -624,6 +897,185 @@ class Locale(object):
         """)
 
 
+class CompiledLocale(object):
+    """Snapshot of the locale data that is used on the hot paths of the
+    date, time and number formatting functions.
+    
+    Accessing the data through the properties of `Locale` involves looking up
+    and resolving the sections of the locale data on every access. A compiled
+    locale instead provides the same data as plain attributes, so that
+    formatting only needs attribute and dictionary lookups:
+    
+    >>> compiled = Locale('en', 'US').compile()
+    >>> compiled.locale
+    <Locale "en_US">
+    >>> compiled.group_symbol, compiled.minus_sign_symbol
+    (u',', u'-')
+    >>> compiled.time_formats['medium']
+    <DateTimePattern u'h:mm:ss a'>
+    >>> compiled.days['format', 'abbreviated']
+    (u'Mon', u'Tue', u'Wed', u'Thu', u'Fri', u'Sat', u'Sun')
+    >>> compiled.first_week_day, compiled.min_week_days
+    (6, 1)
+    
+    The name tables of months, days, quarters and eras are tuples indexed by
+    the same numbers as the mappings of the locale data (so index 0 of the
+    month and quarter names is `None`), keyed by ``(context, width)`` or, for
+    eras, by the width. The snapshot can not be modified:
+    
+    >>> compiled.first_week_day = 0
+    Traceback (most recent call last):
+        ...
+    AttributeError: can't set attribute
+    >>> compiled.decimal_formats[None] = None
+    Traceback (most recent call last):
+        ...
+    TypeError: locale data can not be modified
+    
+    Sections that are missing from the locale data are represented by empty
+    tables, and `None` for the week data. The attributes are only computed
+    when they are first accessed, so formatting numbers does not require the
+    calendar data, and vice versa.
+    """
+    __slots__ = ('locale', 'number_symbols', 'decimal_symbol', 'group_symbol',
+                 'plus_sign_symbol', 'minus_sign_symbol', 'exponential_symbol',
+                 'currency_symbols', 'decimal_formats', 'currency_formats',
+                 'percent_formats', 'scientific_formats', 'date_formats',
+                 'time_formats', 'datetime_formats', 'periods', 'days',
+                 'months', 'quarters', 'eras', 'zone_formats',
+                 'first_week_day', 'weekend_start', 'weekend_end',
+                 'min_week_days')
+
+    def __init__(self, locale):
+        """Create the snapshot for the given locale.
+        
+        :param locale: the `Locale` object
+        """
+        object.__setattr__(self, 'locale', locale)
+
+    def __getattr__(self, name):
+        # the attributes are filled when first accessed, one group of related
+        # attributes at a time, so that only the sections of the locale data
+        # that are actually used get loaded
+        compile = _compilers.get(name)
+        if compile is None:
+            raise AttributeError(name)
+        for key, value in compile(self.locale._data).items():
+            object.__setattr__(self, key, value)
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("can't set attribute")
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, str(self.locale))
+
+
+def _section(data, key):
+    try:
+        return data[key]
+    except KeyError:
+        return {}
+
+def _copy_section(key):
+    def compile(data):
+        section = _section(data, key)
+        return {key: ReadOnlyDict([(name, section[name])
+                                   for name in section.keys()])}
+    return compile
+
+def _compile_number_symbols(data):
+    symbols = _copy_section('number_symbols')(data)['number_symbols']
+    return {
+        'number_symbols': symbols,
+        'decimal_symbol': symbols.get('decimal', u'.'),
+        'group_symbol': symbols.get('group', u','),
+        'plus_sign_symbol': symbols.get('plusSign', u'+'),
+        'minus_sign_symbol': symbols.get('minusSign', u'-'),
+        'exponential_symbol': symbols.get('exponential', u'E')
+    }
+
+def _compile_names(key):
+    def compile(data):
+        contexts = _section(data, key)
+        tables = {}
+        for context in contexts.keys():
+            widths = contexts[context]
+            for width in widths.keys():
+                tables[context, width] = _name_tuple(widths[width])
+        return {key: ReadOnlyDict(tables)}
+    return compile
+
+def _compile_eras(data):
+    eras = _section(data, 'eras')
+    return {'eras': ReadOnlyDict([(width, _name_tuple(eras[width]))
+                                  for width in eras.keys()])}
+
+def _compile_week_data(data):
+    week_data = _section(data, 'week_data')
+    return {
+        'first_week_day': week_data.get('first_day'),
+        'weekend_start': week_data.get('weekend_start'),
+        'weekend_end': week_data.get('weekend_end'),
+        'min_week_days': week_data.get('min_days')
+    }
+
+_compilers = {} # functions computing the attributes of `CompiledLocale`
+for _key in ('currency_symbols', 'decimal_formats', 'currency_formats',
+             'percent_formats', 'scientific_formats', 'date_formats',
+             'time_formats', 'datetime_formats', 'periods', 'zone_formats'):
+    _compilers[_key] = _copy_section(_key)
+for _key in ('days', 'months', 'quarters'):
+    _compilers[_key] = _compile_names(_key)
+for _key in _compile_number_symbols({}):
+    _compilers[_key] = _compile_number_symbols
+for _key in _compile_week_data({}):
+    _compilers[_key] = _compile_week_data
+_compilers['eras'] = _compile_eras
+del _key
+
+
+def _name_tuple(names):
+    """Convert a mapping of names keyed by small integers to a tuple.
+    
+    >>> _name_tuple({1: 'Q1', 2: 'Q2'})
+    (None, 'Q1', 'Q2')
+    """
+    keys = names.keys()
+    if not keys:
+        return ()
+    return tuple([names.get(idx) for idx in range(max(keys) + 1)])
+
+
+def set_locale_registry_limit(max_locales=None):
+    """Limit the number of shared `Locale` instances that `Locale.parse` keeps
+    in its registry.
+    
+    When the limit is exceeded, the least recently requested instances are
+    removed from the registry. By default, the registry is not limited, as
+    there is only a limited number of locales anyway; note that every spelling
+    of a locale identifier takes a separate entry, though.
+    
+    >>> set_locale_registry_limit(100)
+    >>> set_locale_registry_limit()
+    
+    :param max_locales: the maximum number of entries, or `None` for no limit
+    """
+    _locales.maxsize = max_locales
+
+
+def _uncache_locale(name):
+    # called by `localedata` when the data of a locale is evicted from the
+    # cache, so that the shared instances don't keep it in memory
+    for key in _locales.keys():
+        if key[1] == name:
+            locale = _locales.get(key)
+            if locale is not None:
+                locale._uncache()
+
+localedata._uncache_hooks.append(_uncache_locale)
+
+
 def default_locale(category=None, aliases=LOCALE_ALIASES):
     """Returns the system default locale for a given category, based on
     environment variables.
@@ -704,6 +1156,9 @@ def negotiate_locale(preferred, available, sep='_', aliases=LOCALE_ALIASES):
     dictionary to this function, or you can bypass the behavior althogher by
     setting the `aliases` parameter to `None`.
     
+    Applications that negotiate against the same available locales many
+    times should use a `LocaleNegotiator` instead.
+    
     :param preferred: the list of locale strings preferred by the user
     :param available: the list of locale strings available
     :param sep: character that separates the different parts of the locale
@@ -729,6 +1184,181 @@ def negotiate_locale(preferred, available, sep='_', aliases=LOCALE_ALIASES):
             return parts[0]
     return None
 
+
+class LocaleNegotiator(object):
+    """Finds the best match between requested locale strings and a fixed list
+    of available locale strings, following the same rules as
+    `negotiate_locale`.
+    
+    >>> negotiator = LocaleNegotiator(['de_DE', 'de_AT', 'ja_JP', 'en'])
+    >>> negotiator.negotiate(['de_de', 'en_US'])
+    'de_de'
+    >>> negotiator.negotiate(['ja', 'en_US'])
+    'ja_JP'
+    >>> negotiator.negotiate(['en_US'])
+    'en'
+    >>> negotiator.negotiate(['fr_FR'])
+    
+    The available locales are indexed when the negotiator is created, so
+    that negotiation only takes a few dictionary lookups for every preferred
+    locale. The results for the most recently negotiated lists of preferred
+    locales are remembered as well.
+    """
+
+    def __init__(self, available, sep='_', aliases=LOCALE_ALIASES,
+                 cache_size=1000):
+        """Create the negotiator.
+        
+        :param available: the list of locale strings available
+        :param sep: character that separates the different parts of the
+                    locale strings
+        :param aliases: a dictionary of aliases for locale identifiers; later
+                        changes to the dictionary are not taken into account
+        :param cache_size: the maximum number of lists of preferred locales
+                           to remember the result for, or `None` for no limit
+        """
+        self.sep = sep
+        self._identifiers = [a for a in available if a]
+        self._available = set([a.lower() for a in self._identifiers])
+        self._aliases = {}
+        if aliases:
+            for key, alias in aliases.items():
+                alias = alias.replace('_', sep)
+                if alias.lower() in self._available:
+                    self._aliases[key] = alias
+        self._results = LRUCache(maxsize=cache_size)
+        self._headers = LRUCache(maxsize=cache_size)
+
+    def negotiate(self, preferred):
+        """Find the best match for the given requested locale strings.
+        
+        :param preferred: the list of locale strings preferred by the user
+        :return: the locale identifier for the best match, or `None` if no
+                 match was found
+        :rtype: `str`
+        """
+        preferred = tuple(preferred)
+        result = self._results.get(preferred, missing)
+        if result is missing:
+            result = self._negotiate(preferred)
+            self._results[preferred] = result
+        return result
+
+    def negotiate_header(self, header):
+        """Find the best match for the languages requested by an HTTP
+        ``Accept-Language`` header.
+        
+        >>> negotiator = LocaleNegotiator(['de_DE', 'en_US'])
+        >>> negotiator.negotiate_header('fr-CH, fr;q=0.9, en;q=0.8')
+        'en_US'
+        >>> negotiator.negotiate_header('fr-CH, *;q=0.5, de;q=0')
+        'en_US'
+        
+        Languages excluded with a quality of zero are never returned, not even
+        when they would match a more specific language that was requested:
+        
+        >>> LocaleNegotiator(['en']).negotiate_header('en-US, en;q=0')
+        
+        :param header: the value of the ``Accept-Language`` header
+        :return: the locale identifier for the best match, or `None` if no
+                 match was found
+        :rtype: `str`
+        :see: `parse_accept_language`
+        """
+        result = self._headers.get(header, missing)
+        if result is missing:
+            preferred = []
+            excluded = set()
+            for tag, quality in parse_accept_language(header):
+                if not quality:
+                    excluded.add(tag.lower().replace('-', self.sep))
+                elif tag == '*':
+                    preferred.append(None)
+                else:
+                    preferred.append(tag.replace('-', self.sep))
+            result = None
+            for tag in preferred:
+                if tag is None:
+                    for identifier in self._identifiers:
+                        if not self._excluded(identifier, excluded):
+                            result = identifier
+                            break
+                else:
+                    result = self._negotiate((tag,))
+                    if result is not None:
+                        if result.lower() in excluded or (result != tag and
+                                self._excluded(result, excluded)):
+                            result = None
+                if result is not None:
+                    break
+            self._headers[header] = result
+        return result
+
+    def _excluded(self, identifier, excluded):
+        parts = identifier.lower().split(self.sep)
+        for idx in range(len(parts)):
+            if self.sep.join(parts[:idx + 1]) in excluded:
+                return True
+        return False
+
+    def _negotiate(self, preferred):
+        available = self._available
+        aliases = self._aliases
+        sep = self.sep
+        for locale in preferred:
+            ll = locale.lower()
+            if ll in available:
+                return locale
+            alias = aliases.get(ll)
+            if alias:
+                return alias
+            if sep in locale:
+                language = locale.split(sep, 1)[0]
+                if language.lower() in available:
+                    return language
+        return None
+
+
+def parse_accept_language(header):
+    """Parse the value of an HTTP ``Accept-Language`` header into a list of
+    ``(language, quality)`` tuples, ordered by descending quality.
+    
+    >>> parse_accept_language('da, en-GB;q=0.8, en;q=0.7')
+    [('da', 1.0), ('en-GB', 0.8), ('en', 0.7)]
+    >>> parse_accept_language('en;q=0.5, *;q=0.1, de, fr;q=0')
+    [('de', 1.0), ('en', 0.5), ('*', 0.1), ('fr', 0.0)]
+    
+    Languages with the same quality keep the order in which they appear in
+    the header. Entries that cannot be parsed are ignored:
+    
+    >>> parse_accept_language('de;q=high, , en;q=0.9;level=1, fr')
+    [('fr', 1.0), ('en', 0.9)]
+    
+    :param header: the value of the ``Accept-Language`` header
+    :return: the list of languages and their quality values
+    :rtype: `list`
+    """
+    result = []
+    for index, entry in enumerate(header.split(',')):
+        params = entry.split(';')
+        tag = params.pop(0).strip()
+        if not tag:
+            continue
+        quality = 1.0
+        for param in params:
+            name = param.split('=', 1)[0].strip().lower()
+            if name == 'q':
+                try:
+                    quality = min(max(float(param.split('=', 1)[1]), 0.0), 1.0)
+                except (IndexError, ValueError):
+                    quality = None
+                break
+        if quality is not None:
+            result.append((-quality, index, tag))
+    result.sort()
+    return [(tag, -quality) for quality, index, tag in result]
+
+
 def parse_locale(identifier, sep='_'):
     """Parse a locale identifier into a tuple of the form::
     
@@ -26,14 +26,20 @@ from datetime import date, datetime, time, timedelta
 import re
 
 from babel.core import default_locale, get_global, Locale
-from babel.util import UTC
+from babel.util import LRUCache, missing, UTC
 
-__all__ = ['format_date', 'format_datetime', 'format_time', 'format_timedelta',
+__all__ = ['DateFormatter', 'StreamingDateFormatter', 'format_date',
+           'format_dates', 'format_datetime', 'format_datetimes',
+           'format_time', 'format_times', 'format_timedelta',
            'get_timezone_name', 'parse_date', 'parse_datetime', 'parse_time']
 __docformat__ = 'restructuredtext en'
 
 LC_TIME = default_locale('LC_TIME')
 
+_pattern_cache = LRUCache(maxsize=1000) # parsed patterns by pattern string
+_formatter_cache = LRUCache(maxsize=1000) # formatters by pattern and locale
+_timezone_names = LRUCache(maxsize=10000) # display names by locale and zone
+
 # Aliases for use in scopes where the modules are shadowed by local variables
 date_ = date
 datetime_ = datetime
@@ -265,6 +271,13 @@ def get_timezone_location(dt_or_tzinfo=None, locale=LC_TIME):
     else:
         zone = tzinfo.tzname(dt or datetime.utcnow())
 
+    key = (locale, zone)
+    name = _timezone_names.get(key)
+    if name is None:
+        name = _timezone_names[key] = _get_timezone_location(zone, locale)
+    return name
+
+def _get_timezone_location(zone, locale):
     # Get the canonical time-zone code
     zone = get_global('zone_aliases').get(zone, zone)
 
@@ -384,42 +397,51 @@ def get_timezone_name(dt_or_tzinfo=None, width='long', uncommon=False,
     else:
         zone = tzinfo.tzname(dt)
 
+    # The fields used for explicitly translated zone names and for metazone
+    # names are not determined the same way
+    if dt is None:
+        zone_field = metazone_field = 'generic'
+    else:
+        dst = tzinfo.dst(dt)
+        if dst is None:
+            zone_field = 'generic'
+        elif dst == 0:
+            zone_field = 'standard'
+        else:
+            zone_field = 'daylight'
+        metazone_field = dst and 'daylight' or 'standard'
+
+    key = (locale, zone, width, uncommon, zone_field, metazone_field)
+    name = _timezone_names.get(key, missing)
+    if name is missing:
+        name = _timezone_names[key] = _get_timezone_name(
+            zone, width, uncommon, zone_field, metazone_field, locale)
+    if name is not None:
+        return name
+
+    # If we have a concrete datetime, we assume that the result can't be
+    # independent of daylight savings time, so we return the GMT offset
+    if dt is not None:
+        return get_timezone_gmt(dt, width=width, locale=locale)
+
+    return get_timezone_location(dt_or_tzinfo, locale=locale)
+
+def _get_timezone_name(zone, width, uncommon, zone_field, metazone_field,
+                       locale):
     # Get the canonical time-zone code
     zone = get_global('zone_aliases').get(zone, zone)
 
     info = locale.time_zones.get(zone, {})
     # Try explicitly translated zone names first
-    if width in info:
-        if dt is None:
-            field = 'generic'
-        else:
-            dst = tzinfo.dst(dt)
-            if dst is None:
-                field = 'generic'
-            elif dst == 0:
-                field = 'standard'
-            else:
-                field = 'daylight'
-        if field in info[width]:
-            return info[width][field]
+    if width in info and zone_field in info[width]:
+        return info[width][zone_field]
 
     metazone = get_global('meta_zones').get(zone)
     if metazone:
         metazone_info = locale.meta_zones.get(metazone, {})
         if width in metazone_info and (uncommon or metazone_info.get('common')):
-            if dt is None:
-                field = 'generic'
-            else:
-                field = tzinfo.dst(dt) and 'daylight' or 'standard'
-            if field in metazone_info[width]:
-                return metazone_info[width][field]
-
-    # If we have a concrete datetime, we assume that the result can't be
-    # independent of daylight savings time, so we return the GMT offset
-    if dt is not None:
-        return get_timezone_gmt(dt, width=width, locale=locale)
-
-    return get_timezone_location(dt_or_tzinfo, locale=locale)
+            if metazone_field in metazone_info[width]:
+                return metazone_info[width][metazone_field]
 
 def format_date(date=None, format='medium', locale=LC_TIME):
     """Return a date formatted according to the given pattern.
@@ -455,7 +477,7 @@ def format_date(date=None, format='medium', locale=LC_TIME):
 
     locale = Locale.parse(locale)
     if format in ('full', 'long', 'medium', 'short'):
-        format = get_date_format(format, locale=locale)
+        format = locale.compile().date_formats[format]
     pattern = parse_pattern(format)
     return pattern.apply(date, locale)
 
@@ -486,22 +508,14 @@ def format_datetime(datetime=None, format='medium', tzinfo=None,
     :param locale: a `Locale` object or a locale identifier
     :rtype: `unicode`
     """
-    if datetime is None:
-        datetime = datetime_.utcnow()
-    elif isinstance(datetime, (int, long)):
-        datetime = datetime_.utcfromtimestamp(datetime)
-    elif isinstance(datetime, time):
-        datetime = datetime_.combine(date.today(), datetime)
-    if datetime.tzinfo is None:
-        datetime = datetime.replace(tzinfo=UTC)
-    if tzinfo is not None:
-        datetime = datetime.astimezone(tzinfo)
-        if hasattr(tzinfo, 'normalize'): # pytz
-            datetime = tzinfo.normalize(datetime)
-
+    datetime = _get_datetime(datetime, tzinfo)
     locale = Locale.parse(locale)
     if format in ('full', 'long', 'medium', 'short'):
-        return get_datetime_format(format, locale=locale) \
+        patterns = locale.compile().datetime_formats
+        pattern = patterns.get(format)
+        if pattern is None:
+            pattern = patterns[None]
+        return pattern \
             .replace('{0}', format_time(datetime, format, tzinfo=None,
                                         locale=locale)) \
             .replace('{1}', format_date(datetime, format, locale=locale))
@@ -570,6 +584,28 @@ def format_time(time=None, format='medium', tzinfo=None, locale=LC_TIME):
            the value of ``time`` parameter is actually a ``datetime`` object,
            as this function automatically converts that to a ``time``.
     """
+    time = _get_time(time, tzinfo)
+    locale = Locale.parse(locale)
+    if format in ('full', 'long', 'medium', 'short'):
+        format = locale.compile().time_formats[format]
+    return parse_pattern(format).apply(time, locale)
+
+def _get_datetime(datetime, tzinfo):
+    if datetime is None:
+        datetime = datetime_.utcnow()
+    elif isinstance(datetime, (int, long)):
+        datetime = datetime_.utcfromtimestamp(datetime)
+    elif isinstance(datetime, time):
+        datetime = datetime_.combine(date.today(), datetime)
+    if datetime.tzinfo is None:
+        datetime = datetime.replace(tzinfo=UTC)
+    if tzinfo is not None:
+        datetime = datetime.astimezone(tzinfo)
+        if hasattr(tzinfo, 'normalize'): # pytz
+            datetime = tzinfo.normalize(datetime)
+    return datetime
+
+def _get_time(time, tzinfo):
     if time is None:
         time = datetime.utcnow()
     elif isinstance(time, (int, long)):
@@ -584,11 +620,156 @@ def format_time(time=None, format='medium', tzinfo=None, locale=LC_TIME):
         time = time.timetz()
     elif tzinfo is not None:
         time = time.replace(tzinfo=tzinfo)
+    return time
 
+def format_dates(dates, format='medium', locale=LC_TIME):
+    """Return a list of dates formatted according to the given pattern.
+    
+    >>> format_dates([date(2007, 4, 1), datetime(2007, 4, 2, 15, 30), None],
+    ...              locale='en_US')
+    [u'Apr 1, 2007', u'Apr 2, 2007', None]
+    
+    This returns the same strings as calling `format_date` for every value,
+    except that missing values (`None`, or ``NaT`` in NumPy arrays) are
+    returned as `None`. The locale, the pattern and the compiled formatter are
+    only looked up once, and values that appear repeatedly are only formatted
+    once.
+    
+    If NumPy is installed, `dates` can also be an array of ``datetime64``
+    values, in which case the result is an array of objects of the same
+    shape. Values outside the range of the ``datetime`` type (the years 1 to
+    9999) raise a `ValueError`.
+    
+    :param dates: an iterable of ``date`` or ``datetime`` objects, or a NumPy
+                  ``datetime64`` array
+    :param format: one of "full", "long", "medium", or "short", or a custom
+                   date/time pattern
+    :param locale: a `Locale` object or a locale identifier
+    :rtype: `list`
+    :see: `format_date`
+    :since: version 1.0
+    """
     locale = Locale.parse(locale)
     if format in ('full', 'long', 'medium', 'short'):
-        format = get_time_format(format, locale=locale)
-    return parse_pattern(format).apply(time, locale)
+        format = locale.compile().date_formats[format]
+    formatter = DateFormatter(format, locale).format
+    def format_value(value):
+        if isinstance(value, datetime):
+            value = value.date()
+        return formatter(value)
+    if getattr(dates, 'dtype', None) is None:
+        # let datetimes on the same day share the formatted string
+        dates = (isinstance(value, datetime) and value.date() or value
+                 for value in dates)
+    return _format_values(dates, format_value)
+
+def format_datetimes(datetimes, format='medium', tzinfo=None,
+                     locale=LC_TIME):
+    """Return a list of datetimes formatted according to the given pattern.
+    
+    >>> format_datetimes([datetime(2007, 4, 1, 15, 30), 1175441400],
+    ...                  locale='en_US')
+    [u'Apr 1, 2007 3:30:00 PM', u'Apr 1, 2007 3:30:00 PM']
+    
+    This returns the same strings as calling `format_datetime` for every
+    value, except that missing values are returned as `None`; see
+    `format_dates` for the supported inputs.
+    
+    :param datetimes: an iterable of ``datetime``, ``time`` or timestamp
+                      values, or a NumPy ``datetime64`` array
+    :param format: one of "full", "long", "medium", or "short", or a custom
+                   date/time pattern
+    :param tzinfo: the timezone to apply to the time for display
+    :param locale: a `Locale` object or a locale identifier
+    :rtype: `list`
+    :see: `format_datetime`
+    :since: version 1.0
+    """
+    locale = Locale.parse(locale)
+    if format in ('full', 'long', 'medium', 'short'):
+        compiled = locale.compile()
+        pattern = compiled.datetime_formats.get(format)
+        if pattern is None:
+            pattern = compiled.datetime_formats[None]
+        format_date = DateFormatter(compiled.date_formats[format],
+                                    locale).format
+        format_time = DateFormatter(compiled.time_formats[format],
+                                    locale).format
+        def format_value(value):
+            value = _get_datetime(value, tzinfo)
+            return pattern.replace('{0}', format_time(value.timetz())) \
+                          .replace('{1}', format_date(value.date()))
+    else:
+        formatter = DateFormatter(format, locale).format
+        def format_value(value):
+            return formatter(_get_datetime(value, tzinfo))
+    return _format_values(datetimes, format_value)
+
+def format_times(times, format='medium', tzinfo=None, locale=LC_TIME):
+    """Return a list of times formatted according to the given pattern.
+    
+    >>> format_times([time(15, 30), datetime(2007, 4, 1, 8, 15)],
+    ...              format='short', locale='de_DE')
+    [u'15:30', u'08:15']
+    
+    This returns the same strings as calling `format_time` for every value,
+    except that missing values are returned as `None`; see `format_dates` for
+    the supported inputs.
+    
+    :param times: an iterable of ``time``, ``datetime`` or timestamp values,
+                  or a NumPy ``datetime64`` array
+    :param format: one of "full", "long", "medium", or "short", or a custom
+                   date/time pattern
+    :param tzinfo: the time-zone to apply to the time for display
+    :param locale: a `Locale` object or a locale identifier
+    :rtype: `list`
+    :see: `format_time`
+    :since: version 1.0
+    """
+    locale = Locale.parse(locale)
+    if format in ('full', 'long', 'medium', 'short'):
+        format = locale.compile().time_formats[format]
+    formatter = DateFormatter(format, locale).format
+    def format_value(value):
+        return formatter(_get_time(value, tzinfo))
+    return _format_values(times, format_value)
+
+def _format_values(values, format_value, memo_size=10000):
+    """Apply the `format_value` function to a batch of values, returning
+    `None` for missing values, and formatting every distinct value once.
+    """
+    dtype = getattr(values, 'dtype', None)
+    if dtype is not None and dtype.kind == 'M': # NumPy datetime64 array
+        import numpy
+        uniques, inverse = numpy.unique(values, return_inverse=True)
+        results = numpy.empty(len(uniques), dtype=object)
+        for idx, value in enumerate(uniques.astype('datetime64[us]')
+                                           .tolist()):
+            if value is None:
+                continue
+            # NumPy returns plain integers for values that `datetime`
+            # cannot represent, which must not be taken for timestamps
+            if not isinstance(value, datetime):
+                raise ValueError('%s is outside the range of the datetime '
+                                 'type' % uniques[idx])
+            results[idx] = format_value(value)
+        return results[inverse].reshape(values.shape)
+
+    results = []
+    memo = {}
+    for value in values:
+        if value is None:
+            results.append(None)
+            continue
+        # aware values that are equal can still be displayed differently
+        key = (value, getattr(value, 'tzinfo', None))
+        result = memo.get(key)
+        if result is None:
+            if len(memo) >= memo_size:
+                memo.clear()
+            result = memo[key] = format_value(value)
+        results.append(result)
+    return results
 
 TIMEDELTA_UNITS = (
     ('year',   3600 * 24 * 365),
@@ -763,7 +944,12 @@ class DateTimePattern(object):
         return self.format % other
 
     def apply(self, datetime, locale):
-        return self % DateTimeFormat(datetime, locale)
+        locale = Locale.parse(locale)
+        key = (self.pattern, locale)
+        formatter = _formatter_cache.get(key)
+        if formatter is None:
+            formatter = _formatter_cache[key] = DateFormatter(self, locale)
+        return formatter.format(datetime)
 
 
 class DateTimeFormat(object):
@@ -774,6 +960,7 @@ class DateTimeFormat(object):
             value = value.replace(tzinfo=UTC)
         self.value = value
         self.locale = Locale.parse(locale)
+        self.compiled = self.locale.compile()
 
     def __getitem__(self, name):
         char = name[0]
@@ -828,7 +1015,7 @@ class DateTimeFormat(object):
     def format_era(self, char, num):
         width = {3: 'abbreviated', 4: 'wide', 5: 'narrow'}[max(3, num)]
         era = int(self.value.year >= 0)
-        return get_era_names(width, self.locale)[era]
+        return self.compiled.eras[width][era]
 
     def format_year(self, char, num):
         value = self.value.year
@@ -847,14 +1034,14 @@ class DateTimeFormat(object):
             return ('%%0%dd' % num) % quarter
         width = {3: 'abbreviated', 4: 'wide', 5: 'narrow'}[num]
         context = {'Q': 'format', 'q': 'stand-alone'}[char]
-        return get_quarter_names(width, context, self.locale)[quarter]
+        return self.compiled.quarters[context, width][quarter]
 
     def format_month(self, char, num):
         if num <= 2:
             return ('%%0%dd' % num) % self.value.month
         width = {3: 'abbreviated', 4: 'wide', 5: 'narrow'}[num]
         context = {'M': 'format', 'L': 'stand-alone'}[char]
-        return get_month_names(width, context, self.locale)[self.value.month]
+        return self.compiled.months[context, width][self.value.month]
 
     def format_week(self, char, num):
         if char.islower(): # week of year
@@ -876,13 +1063,13 @@ class DateTimeFormat(object):
     def format_weekday(self, char, num):
         if num < 3:
             if char.islower():
-                value = 7 - self.locale.first_week_day + self.value.weekday()
+                value = 7 - self.compiled.first_week_day + self.value.weekday()
                 return self.format(value % 7 + 1, num)
             num = 3
         weekday = self.value.weekday()
         width = {3: 'abbreviated', 4: 'wide', 5: 'narrow'}[num]
         context = {3: 'format', 4: 'format', 5: 'stand-alone'}[num]
-        return get_day_names(width, context, self.locale)[weekday]
+        return self.compiled.days[context, width][weekday]
 
     def format_day_of_year(self, num):
         return self.format(self.get_day_of_year(), num)
@@ -892,7 +1079,7 @@ class DateTimeFormat(object):
 
     def format_period(self, char):
         period = {0: 'am', 1: 'pm'}[int(self.value.hour >= 12)]
-        return get_period_names(locale=self.locale)[period]
+        return self.compiled.periods[period]
 
     def format_frac_seconds(self, num):
         value = str(self.value.microsecond)
@@ -949,17 +1136,284 @@ class DateTimeFormat(object):
         """
         if day_of_week is None:
             day_of_week = self.value.weekday()
-        first_day = (day_of_week - self.locale.first_week_day -
+        first_day = (day_of_week - self.compiled.first_week_day -
                      day_of_period + 1) % 7
         if first_day < 0:
             first_day += 7
         week_number = (day_of_period + first_day - 1) // 7
-        if 7 - first_day >= self.locale.min_week_days:
+        if 7 - first_day >= self.compiled.min_week_days:
             week_number += 1
         return week_number
 
 
-PATTERN_CHARS = {
+class DateFormatter(object):
+    """Formatter for a date/time pattern bound to a locale.
+    
+    >>> formatter = DateFormatter('EEEE, d. MMMM yyyy', 'de_DE')
+    >>> formatter(date(2007, 4, 1))
+    u'Sonntag, 1. April 2007'
+    >>> formatter(datetime(2008, 12, 24, 18, 30))
+    u'Mittwoch, 24. Dezember 2008'
+    
+    The pattern is compiled into a Python function when the formatter is
+    created, with the names of months, days and other fields of the locale
+    built in as constants. Formatting a value therefore doesn't need to look
+    at the pattern or the locale data again, which makes formatters the most
+    efficient way to format many values using the same pattern and locale.
+    The function is also available as the `format` attribute:
+    
+    >>> formatter = DateFormatter("h:mm a 'on' EEE", 'en_US')
+    >>> formatter.format(datetime(2007, 4, 1, 15, 30))
+    u'3:30 PM on Sun'
+    
+    Fields that can not be compiled, such as time-zone names or week
+    numbers, are formatted the same way as by `DateTimePattern.apply`.
+    """
+
+    def __init__(self, pattern, locale=LC_TIME):
+        """Create the formatter.
+        
+        :param pattern: the date/time pattern, or a `DateTimePattern` object
+        :param locale: the `Locale` object, or a locale string
+        :raise `ValueError`: if the pattern is invalid
+        """
+        self.pattern = parse_pattern(pattern)
+        self.locale = Locale.parse(locale)
+        self.format = _compile_formatter(self.pattern, self.locale)
+
+    def __call__(self, value):
+        """Format the given value.
+        
+        :param value: the ``date``, ``datetime`` or ``time`` object
+        :rtype: `unicode`
+        """
+        return self.format(value)
+
+    def __repr__(self):
+        return '<%s %r %r>' % (type(self).__name__, self.pattern.pattern,
+                               str(self.locale))
+
+
+class StreamingDateFormatter(object):
+    """Formatter for a date/time pattern bound to a locale, optimized for
+    formatting many datetimes that fall on the same days, such as the
+    timestamps of a log or event stream.
+    
+    >>> formatter = StreamingDateFormatter('EEEE, d. MMMM yyyy HH:mm:ss',
+    ...                                    'de_DE')
+    >>> formatter(datetime(2007, 4, 1, 15, 30))
+    u'Sonntag, 1. April 2007 15:30:00'
+    >>> formatter(datetime(2007, 4, 1, 15, 30, 1))
+    u'Sonntag, 1. April 2007 15:30:01'
+    
+    The pattern is split into the fields that only depend on the date, which
+    are rendered once per day, and the remaining fields, which are rendered
+    for every value like by `DateFormatter`. Values are converted to the
+    timezone the same way as by `format_datetime`, and the date fields are
+    then rendered from the local date:
+    
+    >>> from pytz import timezone
+    >>> formatter = StreamingDateFormatter('yyyy-MM-dd HH:mm zzzz', 'en_US',
+    ...                                    tzinfo=timezone('US/Eastern'))
+    >>> formatter(datetime(2007, 4, 1, 3, 30))
+    u'2007-03-31 23:30 Eastern Daylight Time'
+    
+    The date fields are kept for up to `cache_size` days at a time, after
+    which they are rendered again as needed.
+    """
+
+    def __init__(self, pattern, locale=LC_TIME, tzinfo=None, cache_size=64):
+        """Create the formatter.
+        
+        :param pattern: the date/time pattern, or a `DateTimePattern` object
+        :param locale: the `Locale` object, or a locale string
+        :param tzinfo: the timezone to apply to the values for display
+        :param cache_size: the number of days to keep the rendered date fields
+                           for
+        :raise `ValueError`: if the pattern is invalid
+        """
+        self.pattern = parse_pattern(pattern)
+        self.locale = Locale.parse(locale)
+        self.tzinfo = tzinfo
+        self.format = self._compile(cache_size)
+
+    def __call__(self, value):
+        """Format the given value.
+        
+        :param value: the ``datetime`` object, or a timestamp
+        :rtype: `unicode`
+        """
+        return self.format(value)
+
+    def __repr__(self):
+        return '<%s %r %r>' % (type(self).__name__, self.pattern.pattern,
+                               str(self.locale))
+
+    def _compile(self, cache_size):
+        parts = _split_format(self.pattern.format)
+        date_fields = [name for name in parts[1::2] if name[0] in _DATE_CHARS]
+        compiled = self.locale.compile()
+        namespace = {'DateTimeFormat': DateTimeFormat, 'locale': self.locale,
+                     'get_datetime': _get_datetime, 'tzinfo': self.tzinfo,
+                     'days': {}, 'cache_size': cache_size}
+        def constant(value):
+            name = 'c%d' % len(namespace)
+            namespace[name] = value
+            return name
+
+        def render_day(value):
+            # the date fields are inserted into the format string used to
+            # render the remaining fields, so literal percent signs need to
+            # stay escaped
+            format = DateTimeFormat(value.date(), self.locale)
+            result = []
+            for idx, part in enumerate(parts):
+                if not idx % 2:
+                    result.append(part)
+                elif part in date_fields:
+                    result.append(format[part].replace('%', '%%'))
+                else:
+                    result.append('%s')
+            return u''.join(result)
+        namespace['render_day'] = render_day
+
+        fields = []
+        fallback = False
+        for name in parts[1::2]:
+            if name not in date_fields:
+                field = _compile_field(name[0], len(name), compiled, constant)
+                if field is None:
+                    field = 'f[%r]' % name
+                    fallback = True
+                fields.append(field)
+
+        result = ['def format(v):',
+                  ' v = get_datetime(v, tzinfo)',
+                  ' day = v.toordinal()',
+                  ' template = days.get(day)',
+                  ' if template is None:',
+                  '  if len(days) >= cache_size:',
+                  '   days.clear()',
+                  '  template = days[day] = render_day(v)']
+        if fallback:
+            result.append(' f = DateTimeFormat(v, locale)')
+        result.append(' return template %% (%s)' % ''.join([
+            field + ', ' for field in fields
+        ]))
+        exec '\n'.join(result) in namespace
+        return namespace['format']
+
+
+_field_re = re.compile(r'(%%|%\(\w+\)s)')
+
+def _split_format(format):
+    """Split the format string of a `DateTimePattern` into a list of the form
+    ``[text, field, text, ..., text]``, where the literal text is still escaped
+    for string formatting.
+    
+    >>> _split_format(u"%(EEEE)s, %(d)s. %(MMMM)s '%%(x)s'")
+    [u'', u'EEEE', u', ', u'd', u'. ', u'MMMM', u" '%%(x)s'"]
+    """
+    parts = [u'']
+    for idx, part in enumerate(_field_re.split(format)):
+        if idx % 2 and part != '%%':
+            parts.extend([part[2:-2], u''])
+        else:
+            parts[-1] += part
+    return parts
+
+def _compile_formatter(pattern, locale):
+    """Generate the function used by `DateFormatter` to format values.
+    
+    :param pattern: the `DateTimePattern` object
+    :param locale: the `Locale` object
+    :return: a function that accepts a value and returns the formatted string
+    """
+    compiled = locale.compile()
+    namespace = {'DateTimeFormat': DateTimeFormat, 'locale': locale}
+    def constant(value):
+        name = 'c%d' % len(namespace)
+        namespace[name] = value
+        return name
+
+    parts = _split_format(pattern.format)
+    fields = []
+    fallback = False
+    for name in parts[1::2]:
+        field = _compile_field(name[0], len(name), compiled, constant)
+        if field is None:
+            field = 'f[%r]' % name
+            fallback = True
+        fields.append(field)
+
+    result = ['def format(v):']
+    if fallback:
+        result.append(' f = DateTimeFormat(v, locale)')
+    result.append(' return %s %% (%s)' % (
+        constant('%s'.join(parts[::2])),
+        ''.join([field + ', ' for field in fields])
+    ))
+    exec '\n'.join(result) in namespace
+    return namespace['format']
+
+def _compile_field(char, num, compiled, constant):
+    """Return the Python expression that formats a field of a date/time
+    pattern for the value ``v``, or `None` if the field needs to be formatted
+    by `DateTimeFormat`.
+    """
+    padded = lambda expr: '%r %% %s' % ('%%0%dd' % num, expr)
+    widths = {3: 'abbreviated', 4: 'wide', 5: 'narrow'}
+    def names(tables, key, index):
+        table = tables.get(key)
+        if table:
+            return '%s[%s]' % (constant(table), index)
+
+    if char == 'G':
+        return names(compiled.eras, widths[max(3, num)], 'v.year >= 0')
+    elif char in ('y', 'u'):
+        if num == 2:
+            return '(%s)[-2:]' % padded('v.year')
+        return padded('v.year')
+    elif char in ('Q', 'q'):
+        quarter = '(v.month - 1) // 3 + 1'
+        if num <= 2:
+            return padded('(%s)' % quarter)
+        context = {'Q': 'format', 'q': 'stand-alone'}[char]
+        return names(compiled.quarters, (context, widths[num]), quarter)
+    elif char in ('M', 'L'):
+        if num <= 2:
+            return padded('v.month')
+        context = {'M': 'format', 'L': 'stand-alone'}[char]
+        return names(compiled.months, (context, widths[num]), 'v.month')
+    elif char == 'd':
+        return padded('v.day')
+    elif char in ('E', 'e', 'c'):
+        if num < 3:
+            if char.islower():
+                return None
+            num = 3
+        context = {3: 'format', 4: 'format', 5: 'stand-alone'}[num]
+        return names(compiled.days, (context, widths[num]), 'v.weekday()')
+    elif char == 'a':
+        if 'am' in compiled.periods and 'pm' in compiled.periods:
+            periods = (compiled.periods['am'], compiled.periods['pm'])
+            return '%s[v.hour >= 12]' % constant(periods)
+    elif char == 'h':
+        return padded('(v.hour % 12 or 12)')
+    elif char == 'H':
+        return padded('v.hour')
+    elif char == 'K':
+        return padded('(v.hour % 12)')
+    elif char == 'k':
+        return padded('(v.hour or 24)')
+    elif char == 'm':
+        return padded('v.minute')
+    elif char == 's':
+        return padded('v.second')
+
+
+# Pattern fields that only depend on the date
+_DATE_CHARS = {
     'G': [1, 2, 3, 4, 5],                                           # era
     'y': None, 'Y': None, 'u': None,                                # year
     'Q': [1, 2, 3, 4], 'q': [1, 2, 3, 4],                           # quarter
@@ -967,12 +1421,16 @@ PATTERN_CHARS = {
     'w': [1, 2], 'W': [1],                                          # week
     'd': [1, 2], 'D': [1, 2, 3], 'F': [1], 'g': None,               # day
     'E': [1, 2, 3, 4, 5], 'e': [1, 2, 3, 4, 5], 'c': [1, 3, 4, 5],  # week day
+}
+
+PATTERN_CHARS = dict(_DATE_CHARS)
+PATTERN_CHARS.update({
     'a': [1],                                                       # period
     'h': [1, 2], 'H': [1, 2], 'K': [1, 2], 'k': [1, 2],             # hour
     'm': [1, 2],                                                    # minute
     's': [1, 2], 'S': None, 'A': None,                              # second
     'z': [1, 2, 3, 4], 'Z': [1, 2, 3, 4], 'v': [1, 4], 'V': [1, 4]  # zone
-}
+})
 
 def parse_pattern(pattern):
     """Parse date, time, and datetime format patterns.
@@ -993,11 +1451,22 @@ def parse_pattern(pattern):
     >>> parse_pattern("hh' o''clock'").format
     u"%(hh)s o'clock"
     
+    The most recently used patterns are cached, so that parsing the same
+    pattern again returns the same object:
+    
+    >>> parse_pattern("MMM d, yyyy") is parse_pattern("MMM d, yyyy")
+    True
+    
     :param pattern: the formatting pattern to parse
     """
     if type(pattern) is DateTimePattern:
         return pattern
+    parsed = _pattern_cache.get(pattern)
+    if parsed is None:
+        parsed = _pattern_cache[pattern] = _parse_pattern(pattern)
+    return parsed
 
+def _parse_pattern(pattern):
     result = []
     quotebuf = None
     charbuf = []
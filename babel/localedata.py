@@ -17,30 +17,91 @@
        more convenient interface for accessing the locale data.
 """
 
+import errno
+from itertools import count
+import mmap
 import os
 import cPickle as pickle
+import stat
+import struct
+import sys
+import tempfile
+import time
+import types
 from UserDict import DictMixin
+import zlib
 
 from babel.compat import threading
 
-__all__ = ['exists', 'locale_identifiers', 'load']
+__all__ = ['cache_stats', 'exists', 'locale_identifiers', 'load',
+           'load_resolved', 'memory_report', 'preload', 'set_cache_limits',
+           'use_image']
 __docformat__ = 'restructuredtext en'
 
 _cache = {}
 _cache_lock = threading.RLock()
+_cache_limits = (None, None) # max. number of locales, max. size in bytes
+_cache_sizes = {} # approximate size of the data of every cached locale
+_cache_parents = {} # the parent locale whose data a cached locale layers over
+_cache_access = {} # when each cached locale was last requested
+_cache_clock = count()
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'load_time': 0.0}
+_resolved = {} # alias-resolving views of the cached locale data
+_preloaded = set() # locales that are never evicted from the cache
+_loading = {} # latches for the locales currently being loaded
+_section_locks = [threading.Lock() for idx in range(16)]
 _dirname = os.path.join(os.path.dirname(__file__), 'localedata')
+_archive = None
+_archive_filename = os.path.join(os.path.dirname(__file__), 'localedata.arc')
+_manifest = None # the directory and contents of the pickle files manifest
+_image = None # the locale data image in use, if any
+_strings = {} # pool of the short unicode strings in the loaded locale data
+_string_refs = {} # number of locales whose data uses every pooled string
+_cache_strings = {} # the pooled strings used by the data of every locale
+_uncache_hooks = [] # called with the identifier of every uncached locale
+
+#: maximum length of the unicode strings in loaded locale data that are taken
+#: from the pool of shared strings
+POOLED_LENGTH = 8
+
+#: sections of the locale data that map codes to display names; their strings
+#: are mostly specific to a locale, so they are loaded as they are, and they
+#: contain no aliases
+NAME_SECTIONS = frozenset(['currency_names', 'languages', 'meta_zones',
+                           'scripts', 'territories', 'time_zones', 'variants'])
+
+#: key under which locale data that was written with the inherited data already
+#: merged in records the identifiers of the locales it was merged from
+MERGED_FROM_KEY = '_merged_from'
+
+#: name of the manifest file in the directory of the locale data pickle files
+MANIFEST_FILENAME = 'manifest.idx'
+
+ARCHIVE_MAGIC = 'BABELARC'
+_ARCHIVE_HEADER = '>8sLL' # magic, index offset, index length
+_ARCHIVE_HEADER_SIZE = struct.calcsize(_ARCHIVE_HEADER)
+
+IMAGE_MAGIC = 'BABELIMG'
+_IMAGE_NODE = '>cL' # node type, payload length
+_IMAGE_NODE_SIZE = struct.calcsize(_IMAGE_NODE)
 
 
 def exists(name):
     """Check whether locale data is available for the given locale.
     
+    This does not access the file system once the locale data archive and the
+    manifest of the pickle files (see `write_manifest`) have been read.
+    
     :param name: the locale identifier string
     :return: `True` if the locale data exists, `False` otherwise
     :rtype: `bool`
     """
     if name in _cache:
         return True
-    return os.path.exists(os.path.join(_dirname, '%s.dat' % name))
+    archive = _get_archive()
+    if archive is not None and name in archive:
+        return True
+    return name in _get_manifest()
 
 
 def locale_identifiers():
@@ -51,12 +112,16 @@ def locale_identifiers():
     :rtype: `list`
     :since: version 0.8.1
     """
-    return [stem for stem, extension in [
-        os.path.splitext(filename) for filename in os.listdir(_dirname)
-    ] if extension == '.dat' and stem != 'root']
+    identifiers = set()
+    archive = _get_archive()
+    if archive is not None:
+        identifiers.update(archive.names())
+    identifiers.update(_get_manifest())
+    identifiers.discard('root')
+    return list(identifiers)
 
 
-def load(name, merge_inherited=True):
+def load(name, merge_inherited=True, sections=None):
     """Load the locale data for the given locale.
     
     The locale data is a dictionary that contains much of the data defined by
@@ -75,43 +140,972 @@ def load(name, merge_inherited=True):
     >>> d1 is d2
     True
     
+    As the cached data is shared, the dictionaries in the sections are
+    read-only (see `ReadOnlyDict`):
+    
+    >>> d1['languages']['sv'] = u'Svenska'
+    Traceback (most recent call last):
+        ...
+    TypeError: locale data can not be modified
+    
+    If a locale data archive (see `ArchiveWriter`) is installed alongside the
+    pickle files, the data is read from the archive instead, and the top-level
+    sections of the returned dictionary are only decoded when they are first
+    accessed.
+    
+    The data inherited from parent locales is merged into the returned
+    dictionary, but only the nested dictionaries that the locale overrides
+    are copied (into a `LayeredDict`); all others are shared with the data of
+    the parent locale:
+    
+    >>> load('de_CH')['months'] is load('de')['months']
+    True
+    
+    Locale data written with the inherited data already merged in (using
+    ``import_cldr.py --merge-inherited``) is marked with the `MERGED_FROM_KEY`
+    key, and is returned as is, without loading the parent locales. Note
+    that this means such data is returned fully merged even when
+    `merge_inherited` is `False`.
+    
+    Applications that only need some of the locale data can restrict loading
+    to a set of top-level sections. The other sections are then only read
+    when they are first accessed:
+    
+    >>> d = load('fr_CA', sections=['number_symbols', 'decimal_formats'])
+    >>> d['number_symbols']['decimal']
+    u','
+    >>> d['territories']['CA']
+    u'Canada'
+    
+    With the pickle files, reading a section that was not loaded means
+    reading the whole file again, whereas an archive is able to read single
+    sections. The `sections` are only taken into account when the locale is
+    not already cached.
+    
     :param name: the locale identifier string (or "root")
     :param merge_inherited: whether the inherited data should be merged into
                             the data of the requested locale
+    :param sections: the keys of the top-level sections to load right away,
+                     or `None` to load all sections
     :return: the locale data
     :rtype: `dict`
     :raise `IOError`: if no locale data file is found for the given locale
                       identifer, or one of the locales it inherits from
     """
+    data = _cache.get(name)
+    if data:
+        # Cache hits are served without acquiring the lock
+        _cache_stats['hits'] += 1
+        _cache_access[name] = _cache_clock.next()
+        return data
+
     _cache_lock.acquire()
     try:
         data = _cache.get(name)
-        if not data:
-            # Load inherited data
-            if name == 'root' or not merge_inherited:
-                data = {}
+        if data:
+            _cache_stats['hits'] += 1
+            _cache_access[name] = _cache_clock.next()
+            return data
+        latch = _loading.get(name)
+        owner = latch is None
+        if owner:
+            _cache_stats['misses'] += 1
+            latch = _loading[name] = _Latch()
+    finally:
+        _cache_lock.release()
+
+    if not owner:
+        # Another thread is already loading this locale, so wait for it
+        # instead of loading the same data again
+        return latch.wait()
+
+    # The lock is not held while the data is read, so that different locales
+    # can be loaded at the same time
+    try:
+        data, size, parent, load_time = _read(name, merge_inherited,
+                                              sections)
+    except:
+        exc_info = sys.exc_info()
+        _cache_lock.acquire()
+        try:
+            del _loading[name]
+        finally:
+            _cache_lock.release()
+        latch.set(exc_info=exc_info)
+        raise
+
+    _cache_lock.acquire()
+    try:
+        _cache[name] = data
+        _cache_sizes[name] = size
+        if parent is not None:
+            _cache_parents[name] = parent
+        _cache_access[name] = _cache_clock.next()
+        _cache_stats['load_time'] += load_time
+        _evict(keep=name)
+        del _loading[name]
+    finally:
+        _cache_lock.release()
+    latch.set(data)
+    return data
+
+
+def load_resolved(name, sections=None):
+    """Load the locale data for the given locale, wrapped in a
+    `LocaleDataDict` that resolves the aliases in the data.
+    
+    The wrapper is shared by all callers for as long as the locale data is
+    cached, so the aliases in every section of a locale are only resolved once:
+    
+    >>> d = load_resolved('en_US')
+    >>> d['days']['stand-alone']['wide'][0]
+    u'Monday'
+    >>> load_resolved('en_US') is d
+    True
+    
+    For the same reason, neither the wrapper nor the dictionaries in it can
+    be modified:
+    
+    >>> d['days']['stand-alone']['wide'][0] = u'Montag'
+    Traceback (most recent call last):
+        ...
+    TypeError: locale data can not be modified
+    
+    :param name: the locale identifier string (or "root")
+    :param sections: the keys of the top-level sections to load right away,
+                     or `None` to load all sections (see `load`)
+    :return: the locale data with aliases resolved
+    :rtype: `LocaleDataDict`
+    :raise `IOError`: if no locale data file is found for the given locale
+                      identifer, or one of the locales it inherits from
+    """
+    data = load(name, sections=sections)
+    resolved = _resolved.get(name)
+    if resolved is None or resolved.base is not data:
+        # Concurrent callers may both get here; that only means the wrapper
+        # of one of them is discarded
+        resolved = _resolved[name] = LocaleDataDict(data)
+    return resolved
+
+
+def preload(locales, sections=None):
+    """Load the data of the given locales up front, including the data they
+    inherit, and resolve all aliases in it.
+    
+    This is intended for servers that fork worker processes: if the locales
+    are preloaded before forking, the workers share the data with the parent
+    process instead of each loading it again on first use. As reading locale
+    data that has been preloaded neither copies nor modifies it, the memory
+    holding the data remains shared between the processes.
+    
+    >>> preload(['de_CH', 'fr_FR'], sections=['territories', 'days'])
+    >>> load_resolved('de_CH')['territories']['CH']
+    u'Schweiz'
+    
+    Preloaded locales, and the locales they inherit from, are exempt from the
+    cache limits set with `set_cache_limits`.
+    
+    :param locales: an iterable of locale identifier strings
+    :param sections: the keys of the top-level sections to resolve, or `None`
+                     to resolve all sections
+    :raise `IOError`: if no locale data file is found for one of the locales
+    """
+    for name in locales:
+        _cache_lock.acquire()
+        try:
+            _preloaded.add(name)
+        finally:
+            _cache_lock.release()
+        data = load_resolved(name, sections=sections)
+        keys = sections
+        if keys is None:
+            keys = data.keys()
+        for key in keys:
+            if key in data:
+                data[key]
+
+
+def use_image(filename=None):
+    """Serve the locale data from a locale data image, writing the image
+    first if it does not exist yet or is older than the installed locale data.
+    
+    An image holds the merged data of all locales, with all aliases resolved,
+    in a single file that is memory-mapped read-only. Dictionaries in the
+    locale data returned by `load` are then `ImageDict` views that decode
+    values from the image whenever they are accessed, rather than keeping
+    them in memory. All processes on a host that use the same image file share
+    a single copy of the data through the operating system, at the cost of
+    slower access to individual values.
+    
+    This should be called before any locale data is loaded, as locale data
+    that is already cached continues to be used.
+    
+    As the image is unpickled, an existing image file is only used if it is
+    owned by the current user and can not be modified by other users;
+    otherwise, the image is written again.
+    
+    :param filename: the path of the image file, or `None` to use a file in a
+                     private directory of the current user in the shared
+                     memory file system (``/dev/shm``), if available, or in
+                     the temporary directory otherwise
+    :return: the path of the image file
+    :rtype: `str`
+    :raise `IOError`: if no image can be written to a file that can be trusted
+    """
+    global _image
+    if filename is None:
+        key = zlib.crc32(os.path.abspath(_dirname)) & 0xffffffffL
+        filename = os.path.join(_private_dir(),
+                                'babel-localedata-%08x.img' % key)
+    sources = [path for path in (_dirname, _archive_filename,
+                                 os.path.join(_dirname, MANIFEST_FILENAME))
+               if os.path.exists(path)]
+    image = None
+    if os.path.isfile(filename) and os.path.getmtime(filename) >= \
+            max([os.path.getmtime(path) for path in sources]):
+        try:
+            image = Image(filename)
+        except IOError:
+            # not an image, or one that may have been tampered with
+            pass
+    if image is None:
+        write_image(filename)
+        image = Image(filename)
+    _cache_lock.acquire()
+    try:
+        _image = image
+    finally:
+        _cache_lock.release()
+    return filename
+
+
+def write_image(filename):
+    """Write an image of the data of all locales to the given file.
+    
+    The image is first written to a temporary file that then replaces the
+    given file, so processes that open the file at the same time never see a
+    partially written image. The locale data loaded to write the image is not
+    kept in the cache.
+    
+    :param filename: the path of the image file
+    :see: `use_image`
+    """
+    _cache_lock.acquire()
+    try:
+        cached = set(_cache)
+    finally:
+        _cache_lock.release()
+    # the temporary file is created exclusively and only accessible by the
+    # current user, so that it can not be swapped for another file
+    dirname, basename = os.path.split(os.path.abspath(filename))
+    fd, tmpname = tempfile.mkstemp(prefix=basename + '.', dir=dirname)
+    fileobj = os.fdopen(fd, 'wb')
+    try:
+        try:
+            writer = ImageWriter(fileobj)
+            for name in ['root'] + locale_identifiers():
+                writer.add(name, load_resolved(name))
+            writer.finish()
+        finally:
+            fileobj.close()
+            _cache_lock.acquire()
+            try:
+                for name in list(_cache):
+                    if name not in cached:
+                        _uncache(name)
+            finally:
+                _cache_lock.release()
+    except:
+        os.remove(tmpname)
+        raise
+    try:
+        os.rename(tmpname, filename)
+    except OSError:
+        # Renaming over an existing file fails on Windows; another process
+        # has written the image in the meantime, so use that
+        os.remove(tmpname)
+
+
+def _private_dir():
+    """Return the directory for locale data images of the current user,
+    creating it if necessary.
+    
+    :raise `IOError`: if the directory exists, but is not a directory that
+                      only the current user can access
+    """
+    dirname = '/dev/shm'
+    if not os.path.isdir(dirname):
+        dirname = tempfile.gettempdir()
+    if not hasattr(os, 'geteuid'):
+        # the temporary directory is already specific to the user on Windows
+        return dirname
+    dirname = os.path.join(dirname, 'babel-%d' % os.geteuid())
+    try:
+        os.mkdir(dirname, 0700)
+    except OSError, e:
+        if e.errno != errno.EEXIST:
+            raise
+    info = os.lstat(dirname)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.geteuid() or \
+            info.st_mode & 0077:
+        raise IOError('%r is not a private directory' % dirname)
+    return dirname
+
+
+def _read(name, merge_inherited, sections):
+    """Read the data of a locale from the archive or its pickle file.
+    
+    :return: a ``(data, size, parent, load_time)`` tuple, where `parent` is
+             the identifier of the locale whose data is layered under the
+             returned data, or `None`
+    """
+    # The pickled data refers to classes in these modules; importing them here
+    # ensures that they are fully initialized before anything is unpickled, as
+    # unpickling in another thread could see a partially imported module
+    import babel.dates, babel.numbers, babel.plural
+
+    image = _image
+    if image is not None and name in image:
+        return image.load(name), 0, None, 0.0
+
+    merge_inherited = merge_inherited and name != 'root'
+    archive = _get_archive()
+    if archive is not None and name in archive:
+        keys = archive.sections(name)
+        if merge_inherited and MERGED_FROM_KEY not in keys:
+            parent = get_parent(name)
+            inherited = load(parent, sections=sections)
+        else:
+            parent = None
+            inherited = {}
+        data = LazyData(inherited)
+        for key in keys:
+            data[key] = LazySection(archive, name, key,
+                                    dict.get(inherited, key))
+        if sections is not None:
+            for key in sections:
+                if key in data:
+                    data[key] # decode the section now
+        return data, archive.size(name), parent, 0.0
+
+    start = time.time()
+    filename = os.path.join(_dirname, '%s.dat' % name)
+    fileobj = open(filename, 'rb')
+    try:
+        size = os.fstat(fileobj.fileno()).st_size
+        data = pickle.load(fileobj)
+    finally:
+        fileobj.close()
+    used = []
+    if sections is None:
+        data = dict([(intern(key), _load_section(key, val, used))
+                     for key, val in data.items()])
+    load_time = time.time() - start
+
+    parent = None
+    inherited = {}
+    if merge_inherited and MERGED_FROM_KEY not in data:
+        parent = get_parent(name)
+        inherited = load(parent, sections=sections)
+    start = time.time()
+    if sections is not None:
+        # Only keep the requested sections, and read the others again from
+        # the file when they are accessed
+        selected = LazyData(inherited)
+        for key, val in data.items():
+            if val is None:
+                continue
+            inherited_val = dict.get(inherited, key)
+            if key in sections or key == MERGED_FROM_KEY:
+                if isinstance(inherited_val, LazySection):
+                    inherited_val = inherited_val.resolve()
+                selected[key] = _layer(inherited_val,
+                                       _load_section(key, val, used))
             else:
-                parts = name.split('_')
-                if len(parts) == 1:
-                    parent = 'root'
+                selected[key] = LazySection(_pickle_files, name, key,
+                                            inherited_val)
+        data = selected
+    elif parent is not None:
+        data = inherit(inherited, data)
+    _track_strings(name, used)
+    load_time += time.time() - start
+    return data, size, parent, load_time
+
+
+class _PickleFiles(object):
+    """Reads single sections of locale data from the pickle files, for the
+    `LazySection` objects of locales that were loaded selectively.
+    """
+
+    def read(self, name, key):
+        fileobj = open(os.path.join(_dirname, '%s.dat' % name), 'rb')
+        try:
+            return pickle.load(fileobj).get(key)
+        finally:
+            fileobj.close()
+
+_pickle_files = _PickleFiles()
+
+
+class _Latch(object):
+    """Lets threads wait for a locale that is being loaded by another thread.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.data = None
+        self.exc_info = None
+
+    def set(self, data=None, exc_info=None):
+        self.data = data
+        self.exc_info = exc_info
+        self.event.set()
+
+    def wait(self):
+        self.event.wait()
+        if self.exc_info is not None:
+            raise self.exc_info[0], self.exc_info[1], self.exc_info[2]
+        return self.data
+
+
+def set_cache_limits(max_locales=None, max_size=None):
+    """Limit the amount of locale data kept in the cache used by `load`.
+    
+    When a limit is exceeded, the least recently requested locales are
+    evicted from the cache. Locales whose data is inherited by other cached
+    locales are only evicted after those locales, and locales loaded with
+    `preload` are never evicted. By default, the cache is not limited.
+    
+    >>> set_cache_limits(max_locales=100)
+    >>> set_cache_limits()
+    
+    Note that evicting a locale from the cache only frees the memory when no
+    `Locale` objects that refer to its data are left.
+    
+    :param max_locales: the maximum number of locales to keep cached, or
+                        `None` for no limit
+    :param max_size: the approximate maximum size of the cached data in bytes
+                     (based on the size of the stored data), or `None` for
+                     no limit
+    """
+    global _cache_limits
+    _cache_lock.acquire()
+    try:
+        _cache_limits = (max_locales, max_size)
+        _evict()
+    finally:
+        _cache_lock.release()
+
+
+def cache_stats():
+    """Return statistics about the cache used by `load`.
+    
+    The returned dictionary contains the following keys:
+    
+     * ``hits``: the number of requests served from the cache
+     * ``misses``: the number of requests that needed to load the locale data
+     * ``evictions``: the number of locales evicted from the cache
+     * ``load_time``: the total time in seconds spent reading and decoding
+       locale data
+     * ``locales``: the number of locales currently cached
+     * ``size``: the approximate size of the cached data in bytes
+    
+    As cache hits are counted without locking, the numbers may be slightly
+    off when `load` is called from multiple threads.
+    
+    >>> stats = cache_stats()
+    >>> stats['locales'] == len(_cache)
+    True
+    
+    :return: a dictionary of statistics
+    :rtype: `dict`
+    """
+    _cache_lock.acquire()
+    try:
+        stats = _cache_stats.copy()
+        stats['locales'] = len(_cache)
+        stats['size'] = _cache_size()
+        return stats
+    finally:
+        _cache_lock.release()
+
+
+def memory_report():
+    """Report the memory used by the cached locale data.
+    
+    The report is a dictionary that maps the identifier of every cached
+    locale to a dictionary with the following keys:
+    
+     * ``size``: the deep size of the locale data in bytes
+     * ``owned``: the part of the size taken by objects that belong to the
+       locale itself
+     * ``shared``: the part of the size taken by objects that belong to other
+       locales, which is mostly data shared with the parent locales
+     * ``sections``: a dictionary that maps the keys of the top-level sections
+       to dictionaries with the same ``size``, ``owned`` and ``shared`` keys
+    
+    Objects are counted as belonging to the first locale they are found in,
+    where parent locales are examined before the locales that inherit from
+    them, so the total size of the cached data is the sum of the ``owned``
+    sizes; adding up the ``size`` or ``shared`` values counts shared data
+    several times. The data of `LocaleDataDict` wrappers shared through
+    `load_resolved` is included, sections that have not been decoded yet are
+    not, and neither are the archive and the image files themselves.
+    
+    >>> report = memory_report()
+    >>> report['de_CH']['size'] == report['de_CH']['owned'] + \\
+    ...                            report['de_CH']['shared']
+    True
+    >>> report['de_CH']['sections']['territories']['shared'] > 0
+    True
+    
+    :return: the memory report
+    :rtype: `dict`
+    :note: this requires Python 2.6 or later, as it uses ``sys.getsizeof``
+    """
+    _cache_lock.acquire()
+    try:
+        cached = _cache.items()
+        wrappers = _resolved.copy()
+    finally:
+        _cache_lock.release()
+    cached.sort(key=lambda item: (item[0] != 'root', item[0].count('_'),
+                                  item[0]))
+    owners = {}
+    report = {}
+    for name, data in cached:
+        seen = set()
+        total = [0, 0]
+        _measure(data, name, owners, seen, total, deep=False)
+        wrapper = wrappers.get(name)
+        if wrapper is not None and wrapper.base is data:
+            _measure(wrapper, name, owners, seen, total, deep=False)
+            _measure(wrapper._resolved, name, owners, seen, total,
+                     deep=False)
+        else:
+            wrapper = None
+        if isinstance(data, ImageDict):
+            # The sections are only held by the wrapper
+            _measure(data._offsets, name, owners, seen, total, deep=False)
+            raw = {}
+        else:
+            raw = data
+        sections = {}
+        for key in data.keys():
+            stats = [0, 0]
+            if key in raw:
+                _measure(dict.__getitem__(raw, key), name, owners, seen,
+                         stats)
+            if wrapper is not None and key in wrapper._resolved:
+                _measure(wrapper._resolved[key], name, owners, seen, stats)
+            sections[key] = _report_entry(stats)
+            total[0] += stats[0]
+            total[1] += stats[1]
+        report[name] = _report_entry(total)
+        report[name]['sections'] = sections
+    return report
+
+
+def _report_entry(stats):
+    owned, shared = stats
+    return {'size': owned + shared, 'owned': owned, 'shared': shared}
+
+
+def _measure(obj, name, owners, seen, stats, deep=True):
+    """Add the size of the given object, and unless `deep` is false, of all
+    the objects it refers to, to the ``[owned, shared]`` list `stats`.
+    """
+    if id(obj) in seen or \
+            isinstance(obj, (Archive, Image, _PickleFiles, type,
+                             types.ModuleType, types.FunctionType)):
+        return
+    seen.add(id(obj))
+    owner = owners.setdefault(id(obj), name)
+    stats[owner != name] += sys.getsizeof(obj)
+    if not deep:
+        return
+    if isinstance(obj, dict):
+        for key, value in dict.items(obj):
+            _measure(key, name, owners, seen, stats)
+            _measure(value, name, owners, seen, stats)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            _measure(item, name, owners, seen, stats)
+    if isinstance(obj, LazySection) and not obj._loaded:
+        return
+    if hasattr(obj, '__dict__'):
+        _measure(obj.__dict__, name, owners, seen, stats)
+    for cls in type(obj).__mro__:
+        for attr in getattr(cls, '__slots__', ()):
+            if hasattr(obj, attr):
+                _measure(getattr(obj, attr), name, owners, seen, stats)
+
+
+def _cache_size():
+    return sum([_cache_sizes.get(name, 0) for name in _cache])
+
+
+def _evict(keep=None):
+    """Evict the least recently requested locales from the cache until it is
+    within the configured limits.
+    
+    :param keep: the identifier of a locale that must not be evicted
+    """
+    max_locales, max_size = _cache_limits
+    if max_locales is None and max_size is None:
+        return
+    while (max_locales is not None and len(_cache) > max_locales) or \
+            (max_size is not None and _cache_size() > max_size):
+        pinned = set([_cache_parents[name] for name in _cache
+                      if name in _cache_parents])
+        pinned.update(_preloaded)
+        candidates = [(_cache_access.get(name, 0), name) for name in _cache
+                      if name != keep and name not in pinned]
+        if not candidates:
+            break
+        _uncache(min(candidates)[1])
+        _cache_stats['evictions'] += 1
+
+
+def _uncache(name):
+    """Remove a locale from the cache; the lock must be held."""
+    for info in (_cache, _cache_sizes, _cache_parents, _cache_access,
+                 _resolved):
+        info.pop(name, None)
+    for hook in _uncache_hooks:
+        hook(name)
+    # Drop the strings that are no longer used by any locale from the pool
+    for value in _cache_strings.pop(name, ()):
+        count = _string_refs[value] - 1
+        if count:
+            _string_refs[value] = count
+        else:
+            del _string_refs[value]
+            del _strings[value]
+
+
+def get_parent(name):
+    """Return the identifier of the locale the given locale inherits its data
+    from.
+    
+    >>> get_parent('de_CH')
+    'de'
+    >>> get_parent('zh_Hant_TW')
+    'zh_Hant'
+    >>> get_parent('de')
+    'root'
+    
+    :param name: the locale identifier string
+    :return: the identifier of the parent locale
+    :rtype: `str`
+    """
+    parts = name.split('_')
+    if len(parts) == 1:
+        return 'root'
+    return '_'.join(parts[:-1])
+
+
+def _get_archive():
+    """Return the installed locale data archive, or `None` if there is none.
+    
+    The archive is opened (and memory-mapped) on first use.
+    """
+    global _archive
+    if _archive is None:
+        _cache_lock.acquire()
+        try:
+            if _archive is None:
+                if os.path.isfile(_archive_filename):
+                    _archive = Archive(_archive_filename)
                 else:
-                    parent = '_'.join(parts[:-1])
-                data = load(parent).copy()
-            filename = os.path.join(_dirname, '%s.dat' % name)
-            fileobj = open(filename, 'rb')
-            try:
-                if name != 'root' and merge_inherited:
-                    merge(data, pickle.load(fileobj))
+                    _archive = False
+        finally:
+            _cache_lock.release()
+    return _archive or None
+
+
+def _get_manifest():
+    """Return the manifest of the locale data pickle files.
+    
+    The manifest is a dictionary that maps the identifier of every locale
+    that has a pickle file to a ``(parents, size)`` tuple, where `parents` are
+    the identifiers of the locales it inherits from, and `size` is the size of
+    the file in bytes. It is read from the manifest file written by
+    `write_manifest` if there is one, and otherwise built from a listing of
+    the directory (without file sizes). Either way this is only done once.
+    """
+    global _manifest
+    manifest = _manifest
+    if manifest is None or manifest[0] != _dirname:
+        _cache_lock.acquire()
+        try:
+            dirname = _dirname
+            filename = os.path.join(dirname, MANIFEST_FILENAME)
+            if os.path.isfile(filename):
+                fileobj = open(filename, 'rb')
+                try:
+                    entries = pickle.load(fileobj)
+                finally:
+                    fileobj.close()
+            else:
+                entries = {}
+                if os.path.isdir(dirname):
+                    for filename in os.listdir(dirname):
+                        stem, extension = os.path.splitext(filename)
+                        if extension == '.dat':
+                            entries[stem] = (_get_parents(stem), None)
+            manifest = _manifest = (dirname, entries)
+        finally:
+            _cache_lock.release()
+    return manifest[1]
+
+
+def _get_parents(name):
+    parents = []
+    while name != 'root':
+        name = get_parent(name)
+        parents.append(name)
+    return tuple(parents)
+
+
+def write_manifest(dirname=None):
+    """Write the manifest of the locale data pickle files in the given
+    directory.
+    
+    The manifest lists the identifiers of the locales, the locales they
+    inherit from, and the sizes of the files. It allows `exists` and
+    `locale_identifiers` to be answered without accessing the file system,
+    and should be rewritten whenever pickle files are added or removed.
+    
+    :param dirname: the directory containing the pickle files, or `None` for
+                    the directory of the locale data of this package
+    """
+    global _manifest
+    if dirname is None:
+        dirname = _dirname
+    entries = {}
+    for filename in os.listdir(dirname):
+        stem, extension = os.path.splitext(filename)
+        if extension == '.dat':
+            size = os.path.getsize(os.path.join(dirname, filename))
+            entries[stem] = (_get_parents(stem), size)
+    fileobj = open(os.path.join(dirname, MANIFEST_FILENAME), 'wb')
+    try:
+        pickle.dump(entries, fileobj, 2)
+    finally:
+        fileobj.close()
+    _manifest = None
+
+
+def intern_strings(value, max_length=None):
+    """Replace the strings in the given locale data by shared, equal strings.
+    
+    Byte strings (which are mostly dictionary keys, such as ``'wide'`` or
+    territory codes) are interned, and unicode strings are taken from a pool
+    of the unicode strings found in locale data so far. Equal strings in the
+    data of different locales thereby become the same object, which saves
+    memory and speeds up dictionary lookups. Dictionaries and lists are
+    modified in place:
+    
+    >>> d1 = intern_strings({'wide': [u'January', u'February']})
+    >>> d2 = intern_strings({'wide'.upper().lower(): [u'Janu' + u'ary']})
+    >>> d1.keys()[0] is d2.keys()[0], d1['wide'][0] is d2['wide'][0]
+    (True, True)
+    
+    When locale data is loaded, only unicode strings of up to `POOLED_LENGTH`
+    characters are taken from the pool, the sections listed in
+    `NAME_SECTIONS` are left alone, and only the keys of the top-level
+    sections are interned (the nested keys are already interned by
+    ``import_cldr.py``, so every pickle file holds a single copy of each of
+    them). The pool keeps track of the locales that
+    use every string, and drops the string when the data of all of them has
+    been evicted from the cache. Strings pooled by calling this function
+    directly are kept for the lifetime of the process.
+    
+    :param value: the locale data, or a part of it
+    :param max_length: the maximum length of the unicode strings to take from
+                       the pool, or `None` for no limit
+    :return: the value with the strings replaced
+    """
+    if max_length is None:
+        max_length = sys.maxint
+    used = []
+    value = _pool_strings(value, max_length, used)
+    _track_strings(None, used)
+    return value
+
+def _pool_strings(value, max_length, used):
+    """Replace the strings in the given locale data by shared, equal strings
+    as described for `intern_strings`, appending the unicode strings taken
+    from the pool to the `used` list.
+    """
+    if type(value) is str:
+        return intern(value)
+    elif type(value) is unicode:
+        if len(value) > max_length:
+            return value
+        value = _strings.setdefault(value, value)
+        used.append(value)
+        return value
+    elif type(value) is dict:
+        pool = _strings
+        for key, val in value.items():
+            # Most keys and values are strings, so handle them directly
+            if type(key) is str:
+                new_key = intern(key)
+            else:
+                new_key = _pool_strings(key, max_length, used)
+            if type(val) is unicode:
+                if len(val) > max_length:
+                    new_val = val
                 else:
-                    data = pickle.load(fileobj)
-                _cache[name] = data
-            finally:
-                fileobj.close()
-        return data
+                    new_val = pool.setdefault(val, val)
+                    used.append(new_val)
+            else:
+                new_val = _pool_strings(val, max_length, used)
+            if new_key is not key:
+                del value[key]
+                value[new_key] = new_val
+            elif new_val is not val:
+                value[key] = new_val
+    elif type(value) is list:
+        value[:] = [_pool_strings(item, max_length, used) for item in value]
+    elif type(value) is tuple:
+        value = tuple([_pool_strings(item, max_length, used)
+                       for item in value])
+    elif isinstance(value, Alias):
+        value.keys = _pool_strings(value.keys, max_length, used)
+    elif hasattr(value, '__dict__'):
+        _pool_strings(value.__dict__, max_length, used)
+    return value
+
+def _load_section(key, value, used):
+    """Prepare a section of locale data read from a file for the cache.
+    
+    The dictionaries in the section are replaced by read-only copies, and
+    unless the section maps codes to display names, the short unicode strings
+    in it are taken from the pool and appended to the `used` list, which
+    should then be passed to `_track_strings`.
+    """
+    if key in NAME_SECTIONS:
+        return _freeze_names(value)
+    return _freeze(value, POOLED_LENGTH, used)
+
+def _freeze_names(value):
+    """Return the given section that maps codes to display names with its
+    dictionaries replaced by `ReadOnlyDict` copies.
+    """
+    if type(value) is not dict:
+        return value
+    # Most of these sections are flat, which is checked without looking at
+    # every item in turn
+    if dict not in set(map(type, value.itervalues())):
+        return ReadOnlyDict(value)
+    return _freeze_dicts(value)
+
+def _freeze_dicts(value):
+    for key, val in value.items():
+        if type(val) is dict:
+            value[key] = _freeze_dicts(val)
+    return ReadOnlyDict(value)
+
+def _freeze(value, max_length, used):
+    """Return the given loaded value with its dictionaries replaced by
+    `ReadOnlyDict` copies, and the unicode strings of up to `max_length`
+    characters taken from the pool.
+    
+    The nested keys are left alone, as replacing them would mean inserting
+    every item again, and ``import_cldr.py`` has already interned them, so
+    every pickle file holds a single copy of each of them.
+    """
+    if type(value) is dict:
+        pool = _strings
+        for key, val in value.items():
+            # Most values are strings, so handle them directly
+            if type(val) is unicode:
+                if len(val) <= max_length:
+                    new_val = pool.setdefault(val, val)
+                    used.append(new_val)
+                    if new_val is not val:
+                        value[key] = new_val
+            elif val is not None and type(val) is not int:
+                new_val = _freeze(val, max_length, used)
+                if new_val is not val:
+                    value[key] = new_val
+        return ReadOnlyDict(value)
+    elif type(value) is tuple:
+        return tuple([_freeze(item, max_length, used) for item in value])
+    return _pool_strings(value, max_length, used)
+
+def _track_strings(name, strings):
+    """Record that the data of the given locale uses the given pooled
+    strings, so that they are kept in the pool until the locale is uncached.
+    
+    The strings recorded for the name `None` are never dropped.
+    """
+    _cache_lock.acquire()
+    try:
+        tracked = _cache_strings.setdefault(name, set())
+        for value in strings:
+            if value in tracked:
+                continue
+            tracked.add(value)
+            count = _string_refs.get(value, 0)
+            if not count:
+                # Another locale using the string may have been uncached
+                # since the string was taken from the pool
+                _strings.setdefault(value, value)
+            _string_refs[value] = count + 1
     finally:
         _cache_lock.release()
 
 
+def inherit(inherited, data):
+    """Combine locale data with the data it inherits, without copying nested
+    dictionaries that the locale does not override.
+    
+    The result is equivalent to merging `data` into a copy of `inherited`
+    using `merge`, but nested dictionaries present in both are combined in a
+    `LayeredDict`, and all other nested dictionaries are shared with the
+    inherited data:
+    
+    >>> parent = {'x': {'a': 1, 'b': 2}, 'y': {'c': 3}}
+    >>> d = inherit(parent, {'x': {'b': 12}})
+    >>> d['x']['a'], d['x']['b']
+    (1, 12)
+    >>> d['y'] is parent['y']
+    True
+    
+    :param inherited: the data inherited from the parent locale
+    :param data: the data specific to the locale
+    :return: the combined locale data
+    :rtype: `dict`
+    """
+    result = inherited.copy()
+    for key, val in data.items():
+        if val is not None:
+            result[key] = _layer(inherited.get(key), val)
+    return result
+
+
+def _layer(inherited, val):
+    """Return the value `val` layered over the `inherited` value for the same
+    key, following the same rules as `merge`.
+    """
+    if not isinstance(val, dict) or inherited is None:
+        return val
+    if not val:
+        return inherited
+    if isinstance(inherited, Alias):
+        return (inherited, val)
+    elif isinstance(inherited, tuple):
+        alias, others = inherited
+        return (alias, LayeredDict(val, others))
+    elif isinstance(inherited, dict):
+        return LayeredDict(val, inherited)
+    return val
+
+
 def merge(dict1, dict2):
     """Merge the data from `dict2` into the `dict1` dictionary, making copies
     of nested dictionaries.
@@ -178,30 +1172,610 @@ class Alias(object):
         return data
 
 
-class LocaleDataDict(DictMixin, dict):
+class ReadOnlyDict(dict):
+    """Dictionary of locale data that can not be modified.
+    
+    The dictionaries in the cached locale data are shared by all users of a
+    locale, so they are read-only, but otherwise behave like any other
+    dictionary:
+    
+    >>> d = ReadOnlyDict({'a': 1})
+    >>> d['a'], isinstance(d, dict)
+    (1, True)
+    >>> d['a'] = 2
+    Traceback (most recent call last):
+        ...
+    TypeError: locale data can not be modified
+    
+    Copies (including those made by the `copy` module and by pickling) are
+    plain, mutable dictionaries:
+    
+    >>> c = d.copy()
+    >>> c['a'] = 2
+    >>> type(c), d['a']
+    (<type 'dict'>, 1)
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('locale data can not be modified')
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = \
+        update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class LocaleDataDict(DictMixin, ReadOnlyDict):
     """Dictionary wrapper that automatically resolves aliases to the actual
     values.
+    
+    All aliases in a top-level section are resolved when the section is first
+    accessed, and the result is remembered, so that subsequent lookups are
+    plain dictionary reads that neither copy nor modify any data. As the
+    wrapper may be shared (see `load_resolved`), it is read-only like the
+    cached locale data itself.
+    
+    >>> d = LocaleDataDict({'x': {'a': 1}, 'y': Alias(['x'])})
+    >>> d['y'] is d['x']
+    True
     """
 
+    __contains__ = dict.__contains__
+    has_key = dict.has_key
+
     def __init__(self, data, base=None):
         dict.__init__(self, data)
         if base is None:
             base = data
         self.base = base
+        self._resolved = {}
 
     def __getitem__(self, key):
-        orig = val = dict.__getitem__(self, key)
-        if isinstance(val, Alias): # resolve an alias
-            val = val.resolve(self.base)
-        if isinstance(val, tuple): # Merge a partial dict with an alias
-            alias, others = val
-            val = alias.resolve(self.base).copy()
-            merge(val, others)
-        if type(val) is dict: # Return a nested alias-resolving dict
-            val = LocaleDataDict(val, base=self.base)
-        if val is not orig:
-            self[key] = val
-        return val
+        try:
+            return self._resolved[key]
+        except KeyError:
+            val = dict.__getitem__(self, key)
+            if key not in NAME_SECTIONS:
+                val = resolve_aliases(val, self.base)
+            elif isinstance(val, LazySection):
+                # The sections that map codes to names contain no aliases, so
+                # they are not searched for any
+                val = val.resolve()
+            # If another thread resolved the same section in the meantime,
+            # use its result so that all readers get the same object
+            return self._resolved.setdefault(key, val)
 
     def copy(self):
         return LocaleDataDict(dict.copy(self), base=self.base)
+
+    def __reduce__(self):
+        return LocaleDataDict, (dict(self), self.base)
+
+
+def resolve_aliases(val, base):
+    """Return the given value of the locale data with all aliases in it
+    replaced by the values they refer to.
+    
+    >>> data = {'x': {'a': 1, 'b': 2}, 'y': {'x': Alias(['x']), 'z': 3}}
+    >>> y = resolve_aliases(data['y'], data)
+    >>> y['x'] is data['x'], y['z']
+    (True, 3)
+    
+    Partial dictionaries combined with an alias are layered over the value
+    the alias refers to. Dictionaries that contain no aliases are returned
+    unchanged, so they remain shared with the locale data (and with the data
+    of any locales it is inherited from):
+    
+    >>> resolve_aliases(data['x'], data) is data['x']
+    True
+    
+    :param val: the value to resolve
+    :param base: the locale data that aliases refer to
+    :return: the resolved value
+    """
+    if isinstance(val, ImageDict): # aliases are resolved in images
+        return val
+    if isinstance(val, LazySection):
+        val = val.resolve()
+    if isinstance(val, Alias):
+        val = val.resolve(base)
+    if isinstance(val, tuple):
+        alias, others = val
+        val = LayeredDict(others, alias.resolve(base))
+    if isinstance(val, dict):
+        changed = {}
+        for key, item in val.items():
+            # Only containers can hold aliases, which saves descending into
+            # the strings that make up most of the data
+            if isinstance(item, (dict, tuple, Alias)):
+                resolved = resolve_aliases(item, base)
+                if resolved is not item:
+                    changed[key] = resolved
+        if changed:
+            val = ReadOnlyDict(val)
+            dict.update(val, changed)
+    return val
+
+
+class LayeredDict(ReadOnlyDict):
+    """Dictionary of locale data layered over the data it inherits.
+    
+    The dictionary holds the inherited items as well as the items specific to
+    the locale, so that it behaves like any other dictionary. Nested
+    dictionaries that the locale does not override are shared with the parent
+    locale rather than copied, and only those that it does override are
+    layered themselves.
+    
+    >>> inherited = {'a': 1, 'b': 2, 'c': {'x': 1}}
+    >>> d = LayeredDict({'b': 12, 'd': 14}, inherited)
+    >>> d['a'], d['b'], d['d']
+    (1, 12, 14)
+    >>> items = d.items(); items.sort(); items
+    [('a', 1), ('b', 12), ('c', {'x': 1}), ('d', 14)]
+    >>> d['c'] is inherited['c']
+    True
+    """
+    __slots__ = ()
+
+    def __init__(self, data, inherited):
+        """Create the layer.
+        
+        :param data: the data specific to the locale
+        :param inherited: the dictionary of inherited data
+        """
+        dict.__init__(self, inherited)
+        dict.update(self, data)
+        # Most values are strings, so the items only need to be looked at
+        # again if there are nested dictionaries or missing values
+        types = set(map(type, data.itervalues()))
+        if type(None) in types or [t for t in types if issubclass(t, dict)]:
+            for key, val in data.items():
+                if val is None:
+                    if key in inherited:
+                        dict.__setitem__(self, key, inherited[key])
+                    else:
+                        dict.__delitem__(self, key)
+                elif isinstance(val, dict):
+                    dict.__setitem__(self, key,
+                                     _layer(inherited.get(key), val))
+
+
+class LazySection(object):
+    """A top-level section of the locale data that is only decoded from the
+    archive when it is first accessed.
+    
+    If the section has inherited data, that data is merged with the decoded
+    value at the same time.
+    """
+
+    def __init__(self, archive, name, key, inherited=None):
+        """Create the section placeholder.
+        
+        :param archive: the `Archive` containing the section, or another
+                        object with a compatible `read` method
+        :param name: the locale identifier
+        :param key: the key of the section in the locale data
+        :param inherited: the value of the same section in the parent locale,
+                          which may itself be a `LazySection`
+        """
+        self.archive = archive
+        self.name = name
+        self.key = key
+        self.inherited = inherited
+        self._value = None
+        self._loaded = False
+
+    def __repr__(self):
+        return '<%s %r of %r>' % (type(self).__name__, self.key, self.name)
+
+    def resolve(self):
+        """Decode the section, merging it with the inherited data.
+        
+        The result is remembered, so the archive is only read once.
+        
+        :return: the value of the section
+        """
+        if self._loaded:
+            return self._value
+        # Resolve the inherited section first, so that no lock is held while
+        # waiting for another section
+        inherited = self.inherited
+        if isinstance(inherited, LazySection):
+            inherited = inherited.resolve()
+        lock = _section_locks[hash((self.name, self.key)) %
+                              len(_section_locks)]
+        lock.acquire()
+        try:
+            if not self._loaded:
+                start = time.time()
+                used = []
+                value = _load_section(self.key,
+                                      self.archive.read(self.name, self.key),
+                                      used)
+                _track_strings(self.name, used)
+                if value is None:
+                    value = inherited
+                else:
+                    value = _layer(inherited, value)
+                _cache_stats['load_time'] += time.time() - start
+                self._value = value
+                self._loaded = True
+                self.inherited = None
+        finally:
+            lock.release()
+        return self._value
+
+
+class LazyData(DictMixin, dict):
+    """Dictionary of locale data that decodes `LazySection` values when they
+    are accessed.
+    """
+
+    __contains__ = dict.__contains__
+    has_key = dict.has_key
+
+    def __getitem__(self, key):
+        val = dict.__getitem__(self, key)
+        if isinstance(val, LazySection):
+            val = val.resolve()
+        return val
+
+    def copy(self):
+        return LazyData(self)
+
+
+class Archive(object):
+    """Read-only access to a locale data archive.
+    
+    An archive bundles the data of many locales in a single file that is
+    memory-mapped. Every top-level section of the locale data is pickled
+    separately, and an index records the location of each section, so that
+    a section can be decoded without touching the rest of the file.
+    
+    >>> import tempfile
+    >>> fd, filename = tempfile.mkstemp()
+    >>> fileobj = os.fdopen(fd, 'wb')
+    >>> writer = ArchiveWriter(fileobj)
+    >>> writer.add('xx', {'languages': {'xx': u'Xish'}, 'variants': {}})
+    >>> writer.finish()
+    >>> fileobj.close()
+    
+    >>> archive = Archive(filename)
+    >>> 'xx' in archive
+    True
+    >>> archive.read('xx', 'languages')
+    {'xx': u'Xish'}
+    >>> archive.close()
+    >>> os.remove(filename)
+    
+    :see: `ArchiveWriter`
+    """
+
+    def __init__(self, filename):
+        """Open the archive.
+        
+        :param filename: the path to the archive file
+        :raise `IOError`: if the file is not a locale data archive
+        """
+        fileobj = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(fileobj.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        finally:
+            fileobj.close()
+        header = self._map[:_ARCHIVE_HEADER_SIZE]
+        if len(header) != _ARCHIVE_HEADER_SIZE or \
+                not header.startswith(ARCHIVE_MAGIC):
+            self._map.close()
+            raise IOError('%r is not a locale data archive' % filename)
+        magic, offset, length = struct.unpack(_ARCHIVE_HEADER, header)
+        self.index = pickle.loads(self._map[offset:offset + length])
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def close(self):
+        """Release the memory map of the archive."""
+        self._map.close()
+
+    def names(self):
+        """Return the identifiers of all locales in the archive.
+        
+        :rtype: `list`
+        """
+        return self.index.keys()
+
+    def size(self, name):
+        """Return the total size of the pickled sections of a locale.
+        
+        :param name: the locale identifier
+        :rtype: `int`
+        """
+        return sum([length for offset, length in self.index[name].values()])
+
+    def sections(self, name):
+        """Return the keys of the top-level sections stored for a locale.
+        
+        :param name: the locale identifier
+        :rtype: `list`
+        """
+        return self.index[name].keys()
+
+    def read(self, name, key):
+        """Decode a single top-level section of the data for a locale.
+        
+        :param name: the locale identifier
+        :param key: the key of the section
+        :return: the unpickled section
+        """
+        offset, length = self.index[name][key]
+        return pickle.loads(self._map[offset:offset + length])
+
+
+class ArchiveWriter(object):
+    """Writes the data of multiple locales to an archive file that can be
+    read using `Archive`.
+    
+    The sections are written as they are added, and the index is appended
+    when the archive is finished, so only the index needs to be kept in
+    memory.
+    """
+
+    def __init__(self, fileobj):
+        """Start a new archive.
+        
+        :param fileobj: a seekable file-like object opened for writing in
+                        binary mode, positioned at its start
+        """
+        self.fileobj = fileobj
+        self.index = {}
+        fileobj.write('\0' * _ARCHIVE_HEADER_SIZE)
+
+    def add(self, name, data):
+        """Add the data of a locale to the archive.
+        
+        :param name: the locale identifier
+        :param data: the locale data dictionary, as written to the
+                     ``<name>.dat`` pickle files
+        """
+        sections = self.index.setdefault(name, {})
+        for key, value in data.items():
+            blob = pickle.dumps(value, 2)
+            sections[key] = (self.fileobj.tell(), len(blob))
+            self.fileobj.write(blob)
+
+    def finish(self):
+        """Write the index and the header of the archive.
+        
+        The file object is not closed.
+        """
+        offset = self.fileobj.tell()
+        blob = pickle.dumps(self.index, 2)
+        self.fileobj.write(blob)
+        self.fileobj.seek(0)
+        self.fileobj.write(struct.pack(_ARCHIVE_HEADER, ARCHIVE_MAGIC, offset,
+                                       len(blob)))
+        self.fileobj.seek(offset + len(blob))
+
+
+class Image(object):
+    """Read-only access to a locale data image.
+    
+    An image holds the fully merged data of many locales in a single file
+    that is memory-mapped. Every dictionary in the data is stored as a table
+    of its keys and the locations of their values, and every other value is
+    pickled separately. Identical values and dictionaries are only stored
+    once.
+    
+    >>> import tempfile
+    >>> fd, filename = tempfile.mkstemp()
+    >>> fileobj = os.fdopen(fd, 'wb')
+    >>> writer = ImageWriter(fileobj)
+    >>> writer.add('xx', {'languages': {'xx': u'Xish'}, 'variants': {}})
+    >>> writer.finish()
+    >>> fileobj.close()
+    
+    >>> image = Image(filename)
+    >>> 'xx' in image
+    True
+    >>> data = image.load('xx')
+    >>> data['languages']['xx']
+    u'Xish'
+    >>> image.close()
+    >>> os.remove(filename)
+    
+    :see: `ImageWriter`, `use_image`
+    """
+
+    def __init__(self, filename):
+        """Open the image.
+        
+        :param filename: the path to the image file
+        :raise `IOError`: if the file is not a locale data image, or if it is
+                          not owned by the current user or can be modified by
+                          other users
+        """
+        fileobj = open(filename, 'rb')
+        try:
+            # the values are unpickled, so the file must not have been
+            # writable by anyone else
+            info = os.fstat(fileobj.fileno())
+            if hasattr(os, 'geteuid') and info.st_uid != os.geteuid() or \
+                    info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                raise IOError('%r may have been modified by other users' %
+                              filename)
+            self._map = mmap.mmap(fileobj.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        finally:
+            fileobj.close()
+        header = self._map[:_ARCHIVE_HEADER_SIZE]
+        if len(header) != _ARCHIVE_HEADER_SIZE or \
+                not header.startswith(IMAGE_MAGIC):
+            self._map.close()
+            raise IOError('%r is not a locale data image' % filename)
+        magic, offset, length = struct.unpack(_ARCHIVE_HEADER, header)
+        self.index = pickle.loads(self._map[offset:offset + length])
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def close(self):
+        """Release the memory map of the image."""
+        self._map.close()
+
+    def names(self):
+        """Return the identifiers of all locales in the image.
+        
+        :rtype: `list`
+        """
+        return self.index.keys()
+
+    def load(self, name):
+        """Return the data of a locale.
+        
+        :param name: the locale identifier
+        :rtype: `ImageDict`
+        """
+        return self.decode(self.index[name])
+
+    def decode(self, offset):
+        """Decode the value stored at the given offset.
+        
+        :param offset: the offset of the value in the image
+        :return: the value, or an `ImageDict` if the value is a dictionary
+        """
+        kind = self._map[offset]
+        if kind == 'D':
+            return ImageDict(self, offset)
+        return self._read(offset)
+
+    def offsets(self, offset):
+        """Decode the table of the dictionary stored at the given offset.
+        
+        :param offset: the offset of the dictionary in the image
+        :return: a dictionary that maps the keys of the dictionary to the
+                 offsets of their values
+        :rtype: `dict`
+        """
+        offsets = {}
+        for key, value in self._read(offset):
+            if type(key) is str:
+                key = intern(key)
+            offsets[key] = value
+        return offsets
+
+    def _read(self, offset):
+        start = offset + _IMAGE_NODE_SIZE
+        kind, length = struct.unpack(_IMAGE_NODE, self._map[offset:start])
+        return pickle.loads(self._map[start:start + length])
+
+
+class ImageDict(DictMixin, object):
+    """Read-only view of a dictionary in a locale data `Image`.
+    
+    The view only holds the locations of the values in the image, which are
+    read when the view is first used, and the values are decoded whenever they
+    are accessed.
+    """
+
+    def __init__(self, image, offset):
+        """Create the view.
+        
+        :param image: the `Image` containing the dictionary
+        :param offset: the offset of the dictionary in the image
+        """
+        self.image = image
+        self.offset = offset
+        self._offsets = None
+
+    def offsets(self):
+        if self._offsets is None:
+            self._offsets = self.image.offsets(self.offset)
+        return self._offsets
+    offsets = property(offsets, doc="""\
+        A dictionary that maps the keys of the dictionary to the offsets of
+        their values in the image.
+        
+        :type: `dict`
+        """)
+
+    def __getitem__(self, key):
+        return self.image.decode(self.offsets[key])
+
+    def __contains__(self, key):
+        return key in self.offsets
+    has_key = __contains__
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def keys(self):
+        return self.offsets.keys()
+
+    def copy(self):
+        """Return a decoded, mutable copy of the dictionary.
+        
+        :rtype: `dict`
+        """
+        return dict(self.items())
+
+
+class ImageWriter(object):
+    """Writes the data of multiple locales to an image file that can be read
+    using `Image`.
+    
+    The data of every locale should be complete, that is, merged with the data
+    it inherits and with all aliases resolved.
+    """
+
+    def __init__(self, fileobj):
+        """Start a new image.
+        
+        :param fileobj: a seekable file-like object opened for writing in
+                        binary mode, positioned at its start
+        """
+        self.fileobj = fileobj
+        self.index = {}
+        self._offsets = {} # the offsets of the nodes written so far
+        fileobj.write('\0' * _ARCHIVE_HEADER_SIZE)
+
+    def add(self, name, data):
+        """Add the data of a locale to the image.
+        
+        :param name: the locale identifier
+        :param data: the locale data, for example as returned by
+                     `load_resolved`
+        """
+        self.index[name] = self._write(data)
+
+    def _write(self, value):
+        if isinstance(value, (dict, ImageDict)):
+            items = [(key, self._write(value[key])) for key in value.keys()]
+            items.sort()
+            node = ('D', pickle.dumps(items, 2))
+        else:
+            node = ('V', pickle.dumps(value, 2))
+        offset = self._offsets.get(node)
+        if offset is None:
+            offset = self._offsets[node] = self.fileobj.tell()
+            kind, blob = node
+            self.fileobj.write(struct.pack(_IMAGE_NODE, kind, len(blob)))
+            self.fileobj.write(blob)
+        return offset
+
+    def finish(self):
+        """Write the index and the header of the image.
+        
+        The file object is not closed.
+        """
+        offset = self.fileobj.tell()
+        blob = pickle.dumps(self.index, 2)
+        self.fileobj.write(blob)
+        self.fileobj.seek(0)
+        self.fileobj.write(struct.pack(_ARCHIVE_HEADER, IMAGE_MAGIC, offset,
+                                       len(blob)))
+        self.fileobj.seek(offset + len(blob))
@@ -13,15 +13,11 @@
 
 """Data structures for message catalogs."""
 
-from cgi import parse_header
 from datetime import datetime
-from difflib import get_close_matches
-from email import message_from_string
 from copy import copy
 import re
 import time
 
-from babel import __version__ as VERSION
 from babel.core import Locale
 from babel.dates import format_datetime
 from babel.messages.plurals import get_plural
@@ -137,9 +133,9 @@ class Message(object):
         :see: `Catalog.check` for a way to perform checks for all messages
               in a catalog.
         """
-        from babel.messages.checkers import checkers
+        from babel.messages.checkers import get_checkers
         errors = []
-        for checker in checkers:
+        for checker in get_checkers():
             try:
                 checker(catalog, self)
             except TranslationError, e:
@@ -340,10 +336,12 @@ class Catalog(object):
         headers.append(('Content-Type',
                         'text/plain; charset=%s' % self.charset))
         headers.append(('Content-Transfer-Encoding', '8bit'))
+        from babel import __version__ as VERSION
         headers.append(('Generated-By', 'Babel %s\n' % VERSION))
         return headers
 
     def _set_mime_headers(self, headers):
+        from cgi import parse_header
         for name, value in headers:
             name = name.lower()
             if name == 'project-id-version':
@@ -609,6 +607,7 @@ class Catalog(object):
         elif id == '':
             # special treatment for the header message
             def _parse_header(header_string):
+                from email import message_from_string
                 # message_from_string only works for str, not for unicode
                 headers = message_from_string(header_string.encode('utf8'))
                 decoded_headers = {}
@@ -757,6 +756,7 @@ class Catalog(object):
         # Prepare for fuzzy matching
         fuzzy_candidates = []
         if not no_fuzzy_matching:
+            from difflib import get_close_matches
             fuzzy_candidates = dict([
                 (self._key_for(msgid), messages[msgid].context)
                 for msgid in messages if msgid and messages[msgid].string
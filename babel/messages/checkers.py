@@ -17,8 +17,15 @@
 """
 
 from itertools import izip
+from babel.compat import threading
 from babel.messages.catalog import TranslationError, PYTHON_FORMAT
 
+__all__ = ['get_checkers', 'set_checkers', 'num_plurals', 'python_format']
+__docformat__ = 'restructuredtext en'
+
+_checkers = None
+_checkers_lock = threading.Lock()
+
 #: list of format chars that are compatible to each other
 _string_format_compatibilities = [
     set(['i', 'd', 'u']),
@@ -159,6 +166,64 @@ def _validate_format(format, alternative):
                                        (name, typechar, type_map[name]))
 
 
+def get_checkers():
+    """Return the list of checkers that `Message.check` runs on messages.
+    
+    Unless the checkers have been set explicitly using `set_checkers`, they
+    are discovered through the ``babel.checkers`` entry points when this
+    function is first called, and the result is reused afterwards. If
+    ``pkg_resources`` is not available, the checkers defined in this module
+    are used.
+    
+    :return: the list of checker functions
+    :rtype: `list`
+    :since: version 1.0
+    """
+    global _checkers
+    result = _checkers
+    if result is None:
+        _checkers_lock.acquire()
+        try:
+            if _checkers is None:
+                list.__init__(_checker_list, _find_checkers())
+                _checkers = _checker_list
+            result = _checkers
+        finally:
+            _checkers_lock.release()
+    return result
+
+def set_checkers(checkers):
+    """Set the checkers that `Message.check` runs on messages, so that the
+    ``babel.checkers`` entry points are never scanned.
+    
+    >>> set_checkers([num_plurals])
+    >>> get_checkers() == [num_plurals]
+    True
+    
+    Passing `None` makes `get_checkers` discover the checkers again the next
+    time it is called:
+    
+    >>> set_checkers(None)
+    
+    :param checkers: a sequence of functions that accept a catalog and a
+                     message and raise a `TranslationError` for an invalid
+                     translation, or `None`
+    :since: version 1.0
+    """
+    global _checkers
+    if checkers is not None:
+        checkers = list(checkers)
+    _checkers_lock.acquire()
+    try:
+        if checkers is None:
+            _checkers = None
+        else:
+            list.__init__(_checker_list, checkers)
+            _checkers = _checker_list
+    finally:
+        _checkers_lock.release()
+
+
 def _find_checkers():
     try:
         from pkg_resources import working_set
@@ -170,4 +235,31 @@ def _find_checkers():
     return checkers
 
 
-checkers = _find_checkers()
+class _CheckerList(list):
+    """The list returned by `get_checkers`, which discovers the checkers
+    the first time it is used.
+    """
+
+def _loading(name):
+    method = getattr(list, name)
+    def _method(self, *args):
+        if _checkers is None:
+            get_checkers()
+        return method(self, *args)
+    _method.__name__ = name
+    return _method
+
+for _name in ['__add__', '__contains__', '__delitem__', '__delslice__',
+              '__eq__', '__ge__', '__getitem__', '__getslice__', '__gt__',
+              '__iadd__', '__imul__', '__iter__', '__le__', '__len__',
+              '__lt__', '__mul__', '__ne__', '__repr__', '__reversed__',
+              '__rmul__', '__setitem__', '__setslice__', 'append', 'count',
+              'extend', 'index', 'insert', 'pop', 'remove', 'reverse',
+              'sort']:
+    if hasattr(list, _name):
+        setattr(_CheckerList, _name, _loading(_name))
+del _name
+
+#: the checkers that `Message.check` runs on messages (deprecated, use
+#: `get_checkers` and `set_checkers` instead)
+checkers = _checker_list = _CheckerList()
@@ -599,6 +599,7 @@ class CommandLineInterface(object):
         'compile': 'compile message catalogs to MO files',
         'extract': 'extract messages from source files and generate a POT file',
         'init':    'create new message catalogs from a POT file',
+        'memory':  'report the memory used by the locale data',
         'update':  'update existing message catalogs from a POT file'
     }
 
@@ -987,6 +988,52 @@ class CommandLineInterface(object):
         finally:
             outfile.close()
 
+    def memory(self, argv):
+        """Subcommand for reporting the memory used by the locale data.
+
+        :param argv: the command arguments
+        :since: version 1.0
+        """
+        parser = OptionParser(usage=self.usage % ('memory', ''),
+                              description=self.commands['memory'])
+        parser.add_option('--locale', '-l', dest='locales', metavar='LOCALE',
+                          action='append',
+                          help='locale to load (can be given multiple times; '
+                               'default all locales)')
+        parser.add_option('--sections', '-s', dest='sections',
+                          action='store_true',
+                          help='also report the size of every section')
+        parser.set_defaults(locales=[], sections=False)
+        options, args = parser.parse_args(argv)
+
+        identifiers = options.locales or localedata.locale_identifiers()
+        for identifier in identifiers:
+            try:
+                Locale.preload([identifier])
+            except (ValueError, UnknownLocaleError), e:
+                parser.error(e)
+
+        report = localedata.memory_report()
+        names = report.keys()
+        names.sort()
+        format = '%-20s %10s %10s %10s'
+        print format % ('locale', 'size', 'owned', 'shared')
+        # Every object is owned by exactly one locale, so the owned sizes add
+        # up to the total; the shared sizes count the same objects repeatedly
+        total = 0
+        for name in names:
+            entry = report[name]
+            print format % (name, entry['size'], entry['owned'],
+                            entry['shared'])
+            if options.sections:
+                sections = entry['sections'].items()
+                sections.sort()
+                for key, section in sections:
+                    print format % ('  ' + key, section['size'],
+                                    section['owned'], section['shared'])
+            total += entry['owned']
+        print format % ('total', '-', total, '-')
+
     def update(self, argv):
         """Subcommand for updating existing message catalogs from a template.
 
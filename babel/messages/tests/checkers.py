@@ -12,6 +12,7 @@
 # history and logs, available at http://babel.edgewall.org/log/.
 
 from datetime import datetime
+import doctest
 import time
 import unittest
 from StringIO import StringIO
@@ -20,6 +21,7 @@ from babel import __version__ as VERSION
 from babel.core import Locale, UnknownLocaleError
 from babel.dates import format_datetime
 from babel.messages import checkers
+from babel.messages.catalog import Message, TranslationError
 from babel.messages.plurals import PLURALS
 from babel.messages.pofile import read_po
 from babel.util import LOCALTZ
@@ -362,9 +364,67 @@ msgstr[4] ""
             checkers.num_plurals(catalog, message)
 
 
+class CheckerRegistrationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.find_checkers = checkers._find_checkers
+
+    def tearDown(self):
+        checkers._find_checkers = self.find_checkers
+        checkers.set_checkers(None)
+
+    def test_discovery_is_lazy_and_cached(self):
+        calls = []
+        def find_checkers():
+            calls.append(True)
+            return [checkers.python_format]
+        checkers._find_checkers = find_checkers
+        checkers.set_checkers(None)
+        self.assertEqual([], calls)
+        message = Message('%(name)s', '%s', flags=['python-format'])
+        self.assertEqual(1, len(message.check()))
+        self.assertEqual(1, len(message.check()))
+        self.assertEqual(1, len(calls))
+
+    def test_set_checkers(self):
+        def find_checkers():
+            self.fail('entry points should not be scanned')
+        def checker(catalog, message):
+            raise TranslationError('not %s' % message.id)
+        checkers._find_checkers = find_checkers
+        checkers.set_checkers((checker,))
+        errors = Message('foo', 'bar').check()
+        self.assertEqual(['not foo'], [str(error) for error in errors])
+        self.assertEqual([checker], checkers.get_checkers())
+
+    def test_deprecated_checkers_list(self):
+        calls = []
+        def find_checkers():
+            calls.append(True)
+            return [checkers.python_format]
+        checkers._find_checkers = find_checkers
+        checkers.set_checkers(None)
+        from babel.messages.checkers import checkers as checker_list
+        self.assertEqual([], calls)
+        self.assertEqual([checkers.python_format], list(checker_list))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(True, checker_list is checkers.get_checkers())
+        def checker(catalog, message):
+            raise TranslationError('not %s' % message.id)
+        checker_list.append(checker)
+        errors = Message('foo', 'bar').check()
+        self.assertEqual(['not foo'], [str(error) for error in errors])
+        checkers.set_checkers(None)
+        checker_list.append(checker)
+        self.assertEqual([checkers.python_format, checker], checker_list)
+        self.assertEqual(2, len(calls))
+
+
 def suite():
     suite = unittest.TestSuite()
+    suite.addTest(doctest.DocTestSuite(checkers))
     suite.addTest(unittest.makeSuite(CheckersTestCase))
+    suite.addTest(unittest.makeSuite(CheckerRegistrationTestCase))
     return suite
 
 if __name__ == '__main__':
@@ -604,6 +604,7 @@ commands:
   compile  compile message catalogs to mo files
   extract  extract messages from source files and generate a pot file
   init     create new message catalogs from a pot file
+  memory   report the memory used by the locale data
   update   update existing message catalogs from a pot file
 """, sys.stdout.getvalue().lower())
 
@@ -858,6 +859,21 @@ msgstr[2] ""
                                tzinfo=LOCALTZ, locale='en')},
        open(po_file, 'U').read())
 
+    def test_memory_report(self):
+        self.cli.run(sys.argv + ['memory', '-l', 'de_CH', '-s'])
+        lines = sys.stdout.getvalue().splitlines()
+        self.assertEqual(['locale', 'size', 'owned', 'shared'],
+                         lines[0].split())
+        self.assertEqual(True, [line for line in lines
+                                if line.startswith('de_CH ')] != [])
+        self.assertEqual(True, [line for line in lines
+                                if line.startswith('  territories ')] != [])
+        total = lines[-1].split()
+        self.assertEqual(['total', '-', '-'], total[:2] + total[3:])
+        owned = [int(line.split()[2]) for line in lines[1:-1]
+                 if not line.startswith(' ')]
+        self.assertEqual(sum(owned), int(total[2]))
+
     def test_compile_catalog(self):
         po_file = self._po_file('de_DE')
         mo_file = po_file.replace('.po', '.mo')
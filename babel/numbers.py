@@ -168,7 +168,7 @@ def format_decimal(number, format=None, locale=LC_NUMERIC):
     """
     locale = Locale.parse(locale)
     if not format:
-        format = locale.decimal_formats.get(format)
+        format = locale.compile().decimal_formats.get(format)
     pattern = parse_pattern(format)
     return pattern.apply(number, locale)
 
@@ -195,7 +195,7 @@ def format_currency(number, currency, format=None, locale=LC_NUMERIC):
     """
     locale = Locale.parse(locale)
     if not format:
-        format = locale.currency_formats.get(format)
+        format = locale.compile().currency_formats.get(format)
     pattern = parse_pattern(format)
     return pattern.apply(number, locale, currency=currency)
 
@@ -222,7 +222,7 @@ def format_percent(number, format=None, locale=LC_NUMERIC):
     """
     locale = Locale.parse(locale)
     if not format:
-        format = locale.percent_formats.get(format)
+        format = locale.compile().percent_formats.get(format)
     pattern = parse_pattern(format)
     return pattern.apply(number, locale)
 
@@ -245,7 +245,7 @@ def format_scientific(number, format=None, locale=LC_NUMERIC):
     """
     locale = Locale.parse(locale)
     if not format:
-        format = locale.scientific_formats.get(format)
+        format = locale.compile().scientific_formats.get(format)
     pattern = parse_pattern(format)
     return pattern.apply(number, locale)
 
@@ -478,6 +478,7 @@ class NumberPattern(object):
         return '<%s %r>' % (type(self).__name__, self.pattern)
 
     def apply(self, value, locale, currency=None):
+        compiled = Locale.parse(locale).compile()
         value *= self.scale
         is_negative = int(value < 0)
         if self.exp_prec: # Scientific notation
@@ -500,41 +501,42 @@ class NumberPattern(object):
                 value = value / 10**exp
             exp_sign = ''
             if exp < 0:
-                exp_sign = get_minus_sign_symbol(locale)
+                exp_sign = compiled.minus_sign_symbol
             elif self.exp_plus:
-                exp_sign = get_plus_sign_symbol(locale)
+                exp_sign = compiled.plus_sign_symbol
             exp = abs(exp)
             number = u'%s%s%s%s' % \
                  (self._format_sigdig(value, self.frac_prec[0], 
                                      self.frac_prec[1]), 
-                  get_exponential_symbol(locale),  exp_sign,
+                  compiled.exponential_symbol,  exp_sign,
                   self._format_int(str(exp), self.exp_prec[0],
-                                   self.exp_prec[1], locale))
+                                   self.exp_prec[1], compiled))
         elif '@' in self.pattern: # Is it a siginificant digits pattern?
             text = self._format_sigdig(abs(value),
                                       self.int_prec[0],
                                       self.int_prec[1])
             if '.' in text:
                 a, b = text.split('.')
-                a = self._format_int(a, 0, 1000, locale)
+                a = self._format_int(a, 0, 1000, compiled)
                 if b:
-                    b = get_decimal_symbol(locale) + b
+                    b = compiled.decimal_symbol + b
                 number = a + b
             else:
-                number = self._format_int(text, 0, 1000, locale)
+                number = self._format_int(text, 0, 1000, compiled)
         else: # A normal number pattern
             a, b = split_number(bankersround(abs(value), 
                                              self.frac_prec[1]))
             b = b or '0'
             a = self._format_int(a, self.int_prec[0],
-                                 self.int_prec[1], locale)
-            b = self._format_frac(b, locale)
+                                 self.int_prec[1], compiled)
+            b = self._format_frac(b, compiled)
             number = a + b
         retval = u'%s%s%s' % (self.prefix[is_negative], number,
                                 self.suffix[is_negative])
         if u'¤' in retval:
             retval = retval.replace(u'¤¤', currency.upper())
-            retval = retval.replace(u'¤', get_currency_symbol(currency, locale))
+            retval = retval.replace(u'¤', compiled.currency_symbols.get(
+                currency, currency))
         return retval
 
     def _format_sigdig(self, value, min, max):
@@ -563,20 +565,20 @@ class NumberPattern(object):
             return '%s.%s' % (a, b)
         return a
 
-    def _format_int(self, value, min, max, locale):
+    def _format_int(self, value, min, max, compiled):
         width = len(value)
         if width < min:
             value = '0' * (min - width) + value
         gsize = self.grouping[0]
         ret = ''
-        symbol = get_group_symbol(locale)
+        symbol = compiled.group_symbol
         while len(value) > gsize:
             ret = symbol + value[-gsize:] + ret
             value = value[:-gsize]
             gsize = self.grouping[1]
         return value + ret
 
-    def _format_frac(self, value, locale):
+    def _format_frac(self, value, compiled):
         min, max = self.frac_prec
         if len(value) < min:
             value += ('0' * (min - len(value)))
@@ -585,4 +587,4 @@ class NumberPattern(object):
         width = len(value)
         while len(value) > min and value[-1] == '0':
             value = value[:-1]
-        return get_decimal_symbol(locale) + value
+        return compiled.decimal_symbol + value
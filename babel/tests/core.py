@@ -12,10 +12,19 @@
 # history and logs, available at http://babel.edgewall.org/log/.
 
 import doctest
+import gc
 import os
+import cPickle as pickle
+import shutil
+from subprocess import Popen, PIPE
+import sys
+import tempfile
 import unittest
+import weakref
 
-from babel import core
+import babel
+from babel import core, localedata, numbers
+from babel.compat import threading
 from babel.core import default_locale
 
 class DefaultLocaleTest(unittest.TestCase):
@@ -43,10 +52,439 @@ class DefaultLocaleTest(unittest.TestCase):
         # must not throw an exception
         default_locale('LC_CTYPE')
 
+
+class GlobalDataTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.data = {'meta_zones': {'Europe/Berlin': 'Europe_Central',
+                                    'Europe/Paris': 'Europe_Central'},
+                     'zone_aliases': {'UTC': 'Etc/GMT'}}
+        self.old_state = (core._global_filename, core._global_data)
+        core._global_filename = os.path.join(self.dirname, 'global.dat')
+        core._global_data = None
+
+    def tearDown(self):
+        core._global_filename, core._global_data = self.old_state
+        shutil.rmtree(self.dirname)
+
+    def _write(self, archive=True):
+        fileobj = open(core._global_filename, 'wb')
+        try:
+            if archive:
+                writer = localedata.ArchiveWriter(fileobj)
+                writer.add('global', self.data)
+                writer.finish()
+            else:
+                pickle.dump(self.data, fileobj, 2)
+        finally:
+            fileobj.close()
+
+    def test_archive(self):
+        self._write()
+        self.assertEqual({'UTC': 'Etc/GMT'}, core.get_global('zone_aliases'))
+        data = core._get_global_data()
+        self.assertEqual(False, dict.__getitem__(data, 'meta_zones')._loaded)
+
+    def test_pickle(self):
+        self._write(archive=False)
+        self.assertEqual({'UTC': 'Etc/GMT'}, core.get_global('zone_aliases'))
+
+    def test_missing_key(self):
+        self._write()
+        self.assertEqual({}, core.get_global('foo'))
+        self.assertEqual(False, 'foo' in core._get_global_data())
+
+    def test_load_once_in_threads(self):
+        self._write()
+        results = []
+        start = threading.Event()
+        def run():
+            start.wait()
+            results.append(core.get_global('zone_aliases'))
+        threads = [threading.Thread(target=run) for idx in range(8)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(8, len(results))
+        for result in results:
+            self.assertEqual(True, result is results[0])
+
+
+class LocaleRegistryTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        core.set_locale_registry_limit()
+
+    def test_parse_returns_shared_instance(self):
+        locale = core.Locale.parse('fr_CA')
+        self.assertEqual(True, core.Locale.parse('fr_CA') is locale)
+        self.assertEqual(True, core.Locale.parse('fr-CA', sep='-') is locale)
+        self.assertEqual(False, core.Locale('fr', 'CA') is locale)
+
+    def test_unknown_locale(self):
+        self.assertRaises(core.UnknownLocaleError, core.Locale.parse, 'xx_YY')
+        self.assertRaises(core.UnknownLocaleError, core.Locale.parse, 'xx_YY')
+
+    def test_limit(self):
+        core.set_locale_registry_limit(2)
+        locale = core.Locale.parse('it_CH')
+        core.Locale.parse('es_MX')
+        core.Locale.parse('pt_BR')
+        self.assertEqual(2, len(core._locales))
+        self.assertEqual(False, core.Locale.parse('it_CH') is locale)
+
+
+    def test_evicted_data_is_released(self):
+        locale = core.Locale.parse('it_CH')
+        data = weakref.ref(locale._data)
+        compiled = locale.compile()
+        symbol = compiled.group_symbol
+        localedata.set_cache_limits(max_locales=1)
+        try:
+            localedata.load('sv')
+            self.assertEqual(False, 'it_CH' in localedata._cache)
+            gc.collect()
+            self.assertEqual(None, data())
+            self.assertEqual(False, locale.compile() is compiled)
+            self.assertEqual(symbol, locale.compile().group_symbol)
+            self.assertEqual(True, core.Locale.parse('it_CH') is locale)
+        finally:
+            localedata.set_cache_limits()
+
+
+class LocaleTestCase(unittest.TestCase):
+
+    def test_immutable(self):
+        locale = core.Locale('de', 'CH')
+        self.assertRaises(AttributeError, setattr, locale, 'territory', 'DE')
+        self.assertRaises(AttributeError, setattr, locale, 'foo', 'bar')
+        self.assertEqual('de_CH', str(locale))
+
+    def test_equality_and_hash(self):
+        locale = core.Locale('de', 'CH')
+        self.assertEqual(core.Locale.parse('de_CH'), locale)
+        self.assertEqual('de_CH', locale)
+        self.assertNotEqual(core.Locale('de'), locale)
+        self.assertEqual(hash('de_CH'), hash(locale))
+        self.assertEqual(1, {core.Locale.parse('de_CH'): 1}[locale])
+
+    def test_unicode_components(self):
+        locale = core.Locale.parse(u'de_CH')
+        self.assertEqual(True, type(str(locale)) is str)
+
+    def test_pickle(self):
+        locale = core.Locale('de', 'CH')
+        locale.territories
+        for protocol in (0, 2):
+            data = pickle.dumps(locale, protocol)
+            self.assertEqual(True, len(data) < 200)
+            self.assertEqual(locale, pickle.loads(data))
+
+    def test_unpickle_old_format(self):
+        # pickled by Babel 0.9, whose Locale objects had an instance dict
+        for data in [
+            "ccopy_reg\n_reconstructor\np0\n(cbabel.core\nLocale\np1\n"
+            "c__builtin__\nobject\np2\nNtp3\nRp4\n(dp5\nS'_Locale__data'\n"
+            "p6\nNsS'territory'\np7\nS'CH'\np8\nsS'variant'\np9\nNsS'langu"
+            "age'\np10\nS'de'\np11\nsS'script'\np12\nNsb.",
+            '\x80\x02cbabel.core\nLocale\nq\x00)\x81q\x01}q\x02(U\r_Locale_'
+            '_dataq\x03NU\tterritoryq\x04U\x02CHq\x05U\x07variantq\x06NU\x08'
+            'languageq\x07U\x02deq\x08U\x06scriptq\tNub.'
+        ]:
+            locale = pickle.loads(data)
+            self.assertEqual('de_CH', str(locale))
+            self.assertEqual('CH', locale.territory)
+            self.assertEqual(None, locale.variant)
+            self.assertEqual(core.Locale('de', 'CH').territories['CH'],
+                             locale.territories['CH'])
+            self.assertEqual(hash('de_CH'), hash(locale))
+
+    def test_data_are_dicts(self):
+        # the data is layered over the data of the parent locale, in
+        # dictionaries that hold the inherited items as well
+        locale = core.Locale('fr', 'CA')
+        for name in ('territories', 'languages', 'scripts', 'variants',
+                     'currencies', 'currency_symbols', 'number_symbols',
+                     'time_zones', 'meta_zones', 'zone_formats',
+                     'date_formats', 'months', 'days'):
+            value = getattr(locale, name)
+            self.assertEqual(True, isinstance(value, dict), name)
+            self.assertEqual(True, getattr(locale, name) is value)
+        self.assertEqual(True, isinstance(locale.months['format'], dict))
+        self.assertEqual(core.Locale('fr').territories['FR'],
+                         locale.territories['FR'])
+        self.assertEqual(dict(locale.territories),
+                         dict(locale.territories.items()))
+
+    def test_data_are_read_only(self):
+        # the data is shared by all users of the locale, so it can't be
+        # modified, only copied
+        locale = core.Locale('de')
+        months = locale.months['format']['wide']
+        january = months[1]
+        self.assertRaises(TypeError, months.__setitem__, 1, u'HACKED')
+        self.assertRaises(TypeError, months.update, {1: u'HACKED'})
+        self.assertRaises(TypeError, months.pop, 1)
+        self.assertRaises(TypeError, locale.months.__setitem__, 'format', {})
+        self.assertRaises(TypeError, locale.territories.__delitem__, 'DE')
+        self.assertRaises(TypeError, locale.number_symbols.setdefault, 'x', 1)
+        self.assertEqual(january, core.Locale.parse('de').months['format'][
+            'wide'][1])
+        copied = months.copy()
+        copied[1] = u'HACKED'
+        self.assertEqual(dict, type(copied))
+        self.assertEqual(january, months[1])
+        unpickled = pickle.loads(pickle.dumps(locale.months, 2))
+        self.assertEqual(dict, type(unpickled['format']))
+        self.assertEqual(january, unpickled['format']['wide'][1])
+
+
+class CompiledLocaleTestCase(unittest.TestCase):
+
+    def test_matches_locale_data(self):
+        for identifier in ('en_US', 'de_CH', 'ja_JP', 'ar_EG', 'he'):
+            locale = core.Locale.parse(identifier)
+            compiled = locale.compile()
+            self.assertEqual(True, compiled.locale is locale)
+            self.assertEqual(dict(locale.number_symbols.items()),
+                             compiled.number_symbols)
+            self.assertEqual(locale.number_symbols['decimal'],
+                             compiled.decimal_symbol)
+            self.assertEqual(dict(locale.decimal_formats.items()),
+                             compiled.decimal_formats)
+            self.assertEqual(dict(locale.date_formats.items()),
+                             compiled.date_formats)
+            self.assertEqual(dict(locale.periods.items()), compiled.periods)
+            for context in ('format', 'stand-alone'):
+                for width in ('abbreviated', 'wide', 'narrow'):
+                    months = locale.months[context][width]
+                    for month in range(1, 13):
+                        self.assertEqual(months[month],
+                                         compiled.months[context, width][month])
+                    days = locale.days[context][width]
+                    self.assertEqual(tuple([days[day] for day in range(7)]),
+                                     compiled.days[context, width])
+            self.assertEqual(locale.eras['abbreviated'][1],
+                             compiled.eras['abbreviated'][1])
+            self.assertEqual(locale.first_week_day, compiled.first_week_day)
+            self.assertEqual(locale.min_week_days, compiled.min_week_days)
+            self.assertEqual(locale.weekend_start, compiled.weekend_start)
+            self.assertEqual(locale.weekend_end, compiled.weekend_end)
+
+    def test_cached_and_frozen(self):
+        locale = core.Locale('fr', 'FR')
+        compiled = locale.compile()
+        self.assertEqual(True, locale.compile() is compiled)
+        self.assertRaises(AttributeError, setattr, compiled, 'group_symbol',
+                          u'.')
+        self.assertRaises(AttributeError, setattr, compiled, 'foo', 1)
+        self.assertRaises(TypeError, compiled.number_symbols.__setitem__,
+                          'decimal', u'.')
+        self.assertRaises(TypeError, compiled.months.clear)
+        self.assertRaises(TypeError, compiled.eras.pop, 'wide')
+
+    def test_selected_sections(self):
+        locale = core.Locale('de', sections=['number_symbols'])
+        compiled = locale.compile()
+        self.assertEqual(u',', compiled.decimal_symbol)
+        self.assertEqual(locale.first_week_day, compiled.first_week_day)
+
+    def test_numbers_do_not_load_date_sections(self):
+        old_state = (localedata._archive, localedata._cache.copy(),
+                     localedata._pickle_files.read)
+        reads = []
+        def read(name, key):
+            reads.append(key)
+            return old_state[2](name, key)
+        localedata._archive = False
+        localedata._cache.clear()
+        localedata._pickle_files.read = read
+        try:
+            locale = core.Locale('fr', 'CA', sections=['number_symbols',
+                                                       'decimal_formats'])
+            self.assertEqual(u'1,2', numbers.format_decimal(1.2,
+                                                            locale=locale))
+            self.assertEqual([], reads)
+            locale.compile().months
+            self.assertEqual(set(['months']), set(reads))
+        finally:
+            localedata._archive, cache, localedata._pickle_files.read = \
+                old_state
+            localedata._cache.clear()
+            localedata._cache.update(cache)
+
+
+class LocaleNegotiatorTestCase(unittest.TestCase):
+
+    def test_same_as_negotiate_locale(self):
+        available = ['de_DE', 'de_AT', 'en_US', 'fr', 'ja_JP', 'nb_NO', '']
+        requests = [['de_de', 'de'], ['de', 'en'], ['fr_CA', 'de'],
+                    ['ja', 'de'], ['no_NO', 'de'], ['EN_us'], ['it', 'es'],
+                    ['_fr', 'fr_'], ['FR_be'], []]
+        for sep in ('_', '-'):
+            negotiator = core.LocaleNegotiator(
+                [a.replace('_', sep) for a in available], sep=sep)
+            for preferred in requests:
+                preferred = [p.replace('_', sep) for p in preferred]
+                expected = core.negotiate_locale(
+                    preferred, [a.replace('_', sep) for a in available],
+                    sep=sep)
+                self.assertEqual(expected, negotiator.negotiate(preferred))
+                self.assertEqual(expected, negotiator.negotiate(preferred))
+
+    def test_no_aliases(self):
+        negotiator = core.LocaleNegotiator(['de_DE'], aliases=None)
+        self.assertEqual(None, negotiator.negotiate(['de']))
+
+    def test_results_are_bounded(self):
+        negotiator = core.LocaleNegotiator(['de_DE', 'en'], cache_size=2)
+        negotiator.negotiate(['de'])
+        negotiator.negotiate(['de_DE'])
+        negotiator.negotiate(('en_GB', 'de'))
+        self.assertEqual(2, len(negotiator._results))
+        self.assertEqual('en', negotiator.negotiate(iter(['en_GB', 'de'])))
+
+
+class AcceptLanguageTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        core._negotiators.clear()
+
+    def test_parse(self):
+        self.assertEqual([('en-US', 1.0), ('fr', 0.7), ('de', 0.7)],
+                         core.parse_accept_language(
+                             ' fr ; Q=0.7 ,en-US, de;q=.7'))
+        self.assertEqual([('da', 1.0), ('en', 0.0)],
+                         core.parse_accept_language('en;q=-1, da;q=2'))
+        self.assertEqual([], core.parse_accept_language(''))
+
+    def test_from_accept_language(self):
+        available = ['en_US', 'de_DE', 'pt_BR']
+        locale = core.Locale.from_accept_language('de-AT, de;q=0.8, en;q=0.5',
+                                                  available)
+        self.assertEqual('de_DE', str(locale))
+        self.assertEqual(True, locale is core.Locale.parse('de_DE'))
+        self.assertEqual('pt_BR', str(core.Locale.from_accept_language(
+            'PT-br;q=0.9, en-GB;q=0.3', available)))
+        self.assertEqual(None, core.Locale.from_accept_language('it',
+                                                                available))
+        self.assertEqual(None, core.Locale.from_accept_language('de',
+                                                                available,
+                                                                aliases=None))
+
+    def test_wildcard(self):
+        available = ['en-us', 'de-de']
+        locale = core.Locale.from_accept_language('it, *;q=0.1, en;q=0',
+                                                  available, sep='-')
+        self.assertEqual('de_DE', str(locale))
+        self.assertEqual(None, core.Locale.from_accept_language(
+            '*;q=0.1, en;q=0, de-DE;q=0', available, sep='-'))
+
+    def test_negotiator_is_reused(self):
+        available = ['en_US', 'de_DE']
+        core.Locale.from_accept_language('de', available)
+        core.Locale.from_accept_language('en', list(available))
+        self.assertEqual(1, len(core._negotiators))
+        negotiator = core._negotiators.get((tuple(available), '_', False))
+        self.assertEqual(2, len(negotiator._headers))
+        self.assertEqual('en_US', negotiator.negotiate_header('en'))
+
+    def test_available_iterator(self):
+        for header in ['de', 'en']:
+            locale = core.Locale.from_accept_language(
+                header, iter(['en_US', 'de_DE']))
+            self.assertEqual(header, locale.language)
+
+    def test_custom_aliases_are_reused(self):
+        aliases = {'de': 'de_AT', 'en': 'en_GB'}
+        available = ['en_GB', 'de_AT', 'de_DE']
+        core.Locale.from_accept_language('de', available, aliases=aliases)
+        core.Locale.from_accept_language('en', available, aliases=aliases)
+        self.assertEqual(1, len(core._negotiators))
+        locale = core.Locale.from_accept_language('de', available,
+                                                  aliases=dict(aliases))
+        self.assertEqual('de_AT', str(locale))
+        self.assertEqual(1, len(core._negotiators))
+        locale = core.Locale.from_accept_language('de', available,
+                                                  aliases={'de': 'de_DE'})
+        self.assertEqual('de_DE', str(locale))
+        self.assertEqual(2, len(core._negotiators))
+
+    def test_excluded_language_fallback(self):
+        negotiator = core.LocaleNegotiator(['en', 'de'])
+        self.assertEqual(None, negotiator.negotiate_header('en-US, en;q=0'))
+        self.assertEqual('de', negotiator.negotiate_header(
+            'en-US, de;q=0.5, en;q=0'))
+        self.assertEqual('de', negotiator.negotiate_header(
+            'de-AT, de-DE;q=0'))
+
+    def test_tags_after_wildcard(self):
+        negotiator = core.LocaleNegotiator(['en', 'de'])
+        self.assertEqual('de', negotiator.negotiate_header(
+            'fr, *;q=0.5, de;q=0.3, en;q=0'))
+        negotiator = core.LocaleNegotiator(['en', 'de_DE'])
+        self.assertEqual('de_DE', negotiator.negotiate_header(
+            'fr, *;q=0.5, de-DE;q=0.3, en;q=0, de;q=0'))
+
+    def test_negotiator_argument(self):
+        negotiator = core.LocaleNegotiator(['de-CH', 'fr-CH'], sep='-')
+        locale = core.Locale.from_accept_language('it, fr-ch', negotiator)
+        self.assertEqual('fr_CH', str(locale))
+        self.assertEqual(0, len(core._negotiators))
+
+
+class PackageImportTestCase(unittest.TestCase):
+    # modules that are only needed by some functions, and that take a
+    # noticeable time to import
+    deferred = ['cgi', 'difflib', 'email.parser', 'pkg_resources']
+
+    def _run(self, code):
+        dirname = os.path.dirname(os.path.dirname(babel.__file__))
+        process = Popen([sys.executable, '-c', code], stdout=PIPE,
+                        cwd=os.path.abspath(dirname))
+        return process.communicate()[0].strip()
+
+    def test_deferred_imports(self):
+        output = self._run('import sys, time\n'
+                           'start = time.time()\n'
+                           'import babel.dates, babel.numbers\n'
+                           'import babel.messages.pofile\n'
+                           'print time.time() - start\n'
+                           'print sorted([m for m in %r if m in sys.modules])'
+                           % self.deferred)
+        duration, imported = output.splitlines()
+        self.assertEqual('[]', imported)
+        self.assertEqual(True, float(duration) < 0.5)
+
+    def test_version(self):
+        try:
+            from pkg_resources import get_distribution, ResolutionError
+            try:
+                version = get_distribution('Babel').version
+            except ResolutionError:
+                version = None
+        except ImportError:
+            version = None
+        self.assertEqual(version, babel.__version__)
+        self.assertEqual(repr(version),
+                         self._run('import babel; print repr(babel.__version__)'))
+        self.assertRaises(AttributeError, getattr, babel, 'foo')
+
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(doctest.DocTestSuite(core))
     suite.addTest(unittest.makeSuite(DefaultLocaleTest))
+    suite.addTest(unittest.makeSuite(PackageImportTestCase))
+    suite.addTest(unittest.makeSuite(GlobalDataTestCase))
+    suite.addTest(unittest.makeSuite(LocaleTestCase))
+    suite.addTest(unittest.makeSuite(LocaleRegistryTestCase))
+    suite.addTest(unittest.makeSuite(CompiledLocaleTestCase))
+    suite.addTest(unittest.makeSuite(LocaleNegotiatorTestCase))
+    suite.addTest(unittest.makeSuite(AcceptLanguageTestCase))
     return suite
 
 if __name__ == '__main__':
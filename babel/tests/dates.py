@@ -282,6 +282,244 @@ class TimeZoneAdjustTestCase(unittest.TestCase):
         self.assertEqual('3:30:00 PM +0000', formatted_time)
 
 
+class ParsePatternTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.maxsize = dates._pattern_cache.maxsize
+
+    def tearDown(self):
+        dates._pattern_cache.maxsize = self.maxsize
+
+    def test_cached(self):
+        pattern = dates.parse_pattern(u"EEE, d MMM yyyy 'at' HH:mm")
+        self.assertEqual(True, pattern is dates.parse_pattern(
+            "EEE, d MMM yyyy 'at' HH:mm"))
+        self.assertEqual(True, pattern is dates.parse_pattern(pattern))
+
+    def test_bounded(self):
+        dates._pattern_cache.maxsize = 2
+        pattern = dates.parse_pattern('yyyy')
+        dates.parse_pattern('MM')
+        dates.parse_pattern('dd')
+        self.assertEqual(2, len(dates._pattern_cache))
+        self.assertEqual(False, pattern is dates.parse_pattern('yyyy'))
+        self.assertEqual(pattern.format, dates.parse_pattern('yyyy').format)
+
+    def test_invalid_pattern(self):
+        self.assertRaises(ValueError, dates.parse_pattern, 'dddd')
+        self.assertRaises(ValueError, dates.parse_pattern, 'dddd')
+        self.assertEqual(False, 'dddd' in dates._pattern_cache)
+
+
+class DateFormatterTestCase(unittest.TestCase):
+
+    def test_same_as_datetimeformat(self):
+        values = [date(2007, 4, 1), datetime(2008, 12, 31, 0, 5, 9),
+                  datetime(2009, 7, 4, 12, 30, tzinfo=timezone('US/Eastern')),
+                  time(23, 59, 1)]
+        patterns = ["EEEE, d. MMMM yyyy", "yy-MM-dd'T'HH:mm:ss",
+                    "G QQQ LLL EEEEE ccc e a", "h:mm a 'o''clock' z",
+                    "K/k/H/h ww W D F yyyy YYYY", "MMMMM qq QQQQ '100%'"]
+        for locale in ('en_US', 'de_DE', 'ja_JP', 'ar_EG', 'fi_FI'):
+            for pattern in patterns:
+                pattern = dates.parse_pattern(pattern)
+                formatter = dates.DateFormatter(pattern, locale)
+                for value in values:
+                    try:
+                        expected = pattern % dates.DateTimeFormat(value,
+                                                                  locale)
+                    except (AttributeError, TypeError), e:
+                        self.assertRaises(type(e), formatter, value)
+                    else:
+                        self.assertEqual(expected, formatter(value))
+
+    def test_invalid_pattern(self):
+        self.assertRaises(ValueError, dates.DateFormatter, 'yyyy-MMMMMM',
+                          'en_US')
+
+    def test_quoted_format_string(self):
+        formatter = dates.DateFormatter("yyyy '%(x)s %%(yy)s %' d", 'en_US')
+        self.assertEqual(u'2007 %(x)s %%(yy)s % 1',
+                         formatter(date(2007, 4, 1)))
+        self.assertEqual(u'2007 %(x)s', dates.format_date(
+            date(2007, 4, 1), "yyyy '%(x)s'", locale='en_US'))
+
+    def test_apply_reuses_formatter(self):
+        pattern = dates.parse_pattern('d. MMMM yyyy')
+        self.assertEqual(u'1. April 2007', pattern.apply(date(2007, 4, 1),
+                                                         'de_DE'))
+        formatter = dates._formatter_cache.get((pattern.pattern, 'de_DE'))
+        self.assertEqual('de_DE', str(formatter.locale))
+        self.assertEqual(u'2. April 2007', pattern.apply(date(2007, 4, 2),
+                                                         'de_DE'))
+        self.assertEqual(True, formatter is dates._formatter_cache.get(
+            (pattern.pattern, 'de_DE')))
+
+
+class FormatBatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        eastern = timezone('US/Eastern')
+        self.values = [datetime(2007, 4, 1, 15, 30),
+                       eastern.localize(datetime(2007, 1, 6, 8, 5)),
+                       datetime(2007, 4, 1, 19, 30, tzinfo=timezone('UTC')),
+                       eastern.localize(datetime(2007, 4, 1, 15, 30)),
+                       datetime(2007, 4, 1, 15, 30), 1175441400]
+
+    def test_format_dates(self):
+        values = self.values[:-1] + [date(2008, 2, 29)]
+        for format in ('full', 'short', "EEE, d MMM ''yy"):
+            self.assertEqual([dates.format_date(value, format,
+                                                locale='fr_FR')
+                              for value in values],
+                             dates.format_dates(values, format,
+                                                locale='fr_FR'))
+
+    def test_format_datetimes(self):
+        for format in ('medium', 'short', 'yyyy-MM-dd HH:mm:ss z'):
+            for tzinfo in (None, timezone('Europe/Paris')):
+                self.assertEqual([dates.format_datetime(value, format,
+                                                        tzinfo=tzinfo,
+                                                        locale='en_US')
+                                  for value in self.values],
+                                 dates.format_datetimes(iter(self.values),
+                                                        format, tzinfo=tzinfo,
+                                                        locale='en_US'))
+
+    def test_format_times(self):
+        values = self.values + [time(8, 5), time(23, 59, 59)]
+        for format in ('short', 'medium', "h 'o''clock' a"):
+            for tzinfo in (None, timezone('Asia/Tokyo')):
+                self.assertEqual([dates.format_time(value, format,
+                                                    tzinfo=tzinfo,
+                                                    locale='de_DE')
+                                  for value in values],
+                                 dates.format_times(values, format,
+                                                    tzinfo=tzinfo,
+                                                    locale='de_DE'))
+
+    def test_missing_values(self):
+        self.assertEqual([None, u'15:30', None],
+                         dates.format_times([None, time(15, 30), None],
+                                            format='HH:mm', locale='en_US'))
+        self.assertEqual([], dates.format_dates([], locale='en_US'))
+
+    def test_numpy_datetime64(self):
+        try:
+            import numpy
+        except ImportError:
+            raise unittest.SkipTest('NumPy is not installed')
+        values = numpy.array([['2007-04-01T15:30', 'NaT'],
+                              ['2008-02-29T00:00', '2007-04-01T15:30']],
+                             dtype='datetime64[m]')
+        result = dates.format_datetimes(values, 'yyyy-MM-dd HH:mm',
+                                        locale='en_US')
+        self.assertEqual((2, 2), result.shape)
+        self.assertEqual([[u'2007-04-01 15:30', None],
+                          [u'2008-02-29 00:00', u'2007-04-01 15:30']],
+                         result.tolist())
+
+    def test_numpy_datetime64_out_of_range(self):
+        try:
+            import numpy
+        except ImportError:
+            raise unittest.SkipTest('NumPy is not installed')
+        values = numpy.array(['2007-04-01', '10000-01-01'],
+                             dtype='datetime64[D]')
+        self.assertRaises(ValueError, dates.format_dates, values,
+                          locale='en_US')
+
+
+class StreamingDateFormatterTestCase(unittest.TestCase):
+
+    def test_same_as_format_datetime(self):
+        start = datetime(2007, 3, 10, 22, 0)
+        values = [start + timedelta(minutes=97 * idx) for idx in range(40)]
+        for pattern in ("EEEE, d. MMMM yyyy 'um' HH:mm:ss",
+                        "yy-MM-dd HH:mm zzzz", "'100%' G QQQ h a v"):
+            for tzinfo in (None, timezone('US/Eastern')):
+                formatter = dates.StreamingDateFormatter(pattern, 'de_DE',
+                                                         tzinfo=tzinfo,
+                                                         cache_size=2)
+                for value in values:
+                    self.assertEqual(dates.format_datetime(value, pattern,
+                                                           tzinfo=tzinfo,
+                                                           locale='de_DE'),
+                                     formatter(value))
+
+    def test_date_fields_rendered_once_per_day(self):
+        formatter = dates.StreamingDateFormatter('d MMMM y HH:mm', 'en_US')
+        rendered = []
+        render_day = formatter.format.func_globals['render_day']
+        def counting_render_day(value):
+            rendered.append(value.date())
+            return render_day(value)
+        formatter.format.func_globals['render_day'] = counting_render_day
+        self.assertEqual(u'1 April 2007 15:30',
+                         formatter(datetime(2007, 4, 1, 15, 30)))
+        self.assertEqual(u'1 April 2007 23:59',
+                         formatter(datetime(2007, 4, 1, 23, 59)))
+        self.assertEqual(u'2 April 2007 00:00',
+                         formatter(datetime(2007, 4, 2)))
+        self.assertEqual([date(2007, 4, 1), date(2007, 4, 2)], rendered)
+
+    def test_day_of_year(self):
+        formatter = dates.StreamingDateFormatter('D', 'en_US')
+        self.assertEqual(u'91', formatter(datetime(2007, 4, 1, 12, 0)))
+
+    def test_quoted_format_string(self):
+        formatter = dates.StreamingDateFormatter(
+            "yyyy '%(x)s' HH '%(yy)s %'", 'en_US')
+        for idx in range(2):
+            self.assertEqual(u'2007 %(x)s 15 %(yy)s %',
+                             formatter(datetime(2007, 4, 1, 15, 30)))
+
+
+class TimeZoneNameTestCase(unittest.TestCase):
+
+    def setUp(self):
+        dates._timezone_names.clear()
+        self.tz = timezone('America/Los_Angeles')
+
+    def test_cached(self):
+        name = dates.get_timezone_name(self.tz, locale='en_US')
+        self.assertEqual(1, len(dates._timezone_names))
+        self.assertEqual(name, dates.get_timezone_name(self.tz,
+                                                        locale='en_US'))
+        self.assertEqual(1, len(dates._timezone_names))
+        location = dates.get_timezone_location(self.tz, locale='en_US')
+        self.assertEqual(2, len(dates._timezone_names))
+        self.assertEqual(location, dates.get_timezone_location(self.tz,
+                                                                locale='en_US'))
+        self.assertEqual(2, len(dates._timezone_names))
+
+    def test_daylight_saving(self):
+        winter = self.tz.localize(datetime(2007, 1, 15, 12))
+        summer = self.tz.localize(datetime(2007, 7, 15, 12))
+        standard = dates.get_timezone_name(winter, locale='en_US')
+        daylight = dates.get_timezone_name(summer, locale='en_US')
+        self.assertNotEqual(standard, daylight)
+        self.assertEqual(standard, dates.get_timezone_name(winter,
+                                                           locale='en_US'))
+        self.assertEqual(daylight, dates.get_timezone_name(summer,
+                                                           locale='en_US'))
+
+    def test_gmt_fallback(self):
+        tz = timezone('Etc/GMT+5')
+        dt = tz.localize(datetime(2007, 1, 15, 12))
+        name = dates.get_timezone_name(dt, locale='en_US')
+        self.assertEqual(dates.get_timezone_gmt(dt, locale='en_US'), name)
+        self.assertEqual(1, len(dates._timezone_names))
+        self.assertEqual(name, dates.get_timezone_name(dt, locale='en_US'))
+
+    def test_locales(self):
+        name = dates.get_timezone_name(self.tz, locale='de_DE')
+        self.assertEqual(name, dates.get_timezone_name(self.tz,
+                                                        locale='de_DE'))
+        self.assertNotEqual(name, dates.get_timezone_name(self.tz,
+                                                          locale='ja_JP'))
+
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(doctest.DocTestSuite(dates))
@@ -290,6 +528,11 @@ def suite():
     suite.addTest(unittest.makeSuite(FormatTimeTestCase))
     suite.addTest(unittest.makeSuite(FormatTimedeltaTestCase))
     suite.addTest(unittest.makeSuite(TimeZoneAdjustTestCase))
+    suite.addTest(unittest.makeSuite(ParsePatternTestCase))
+    suite.addTest(unittest.makeSuite(DateFormatterTestCase))
+    suite.addTest(unittest.makeSuite(FormatBatchTestCase))
+    suite.addTest(unittest.makeSuite(StreamingDateFormatterTestCase))
+    suite.addTest(unittest.makeSuite(TimeZoneNameTestCase))
     return suite
 
 
@@ -12,9 +12,15 @@
 # history and logs, available at http://babel.edgewall.org/log/.
 
 import doctest
+import os
+import cPickle as pickle
+import shutil
+import sys
+import tempfile
 import unittest
 
 from babel import localedata
+from babel.compat import threading
 
 
 class MergeResolveTestCase(unittest.TestCase):
@@ -62,11 +68,604 @@ class MergeResolveTestCase(unittest.TestCase):
             'y': {'a': 1, 'b': 22, 'c': 3, 'd': 14, 'e': 25}
         }, dict(d.items()))
 
+    def test_inherit_nested_dict(self):
+        d1 = {'x': {'a': 1, 'b': 2, 'c': 3}, 'y': {'a': 11}}
+        d2 = {'x': {'a': 1, 'b': 12, 'd': 14}}
+        d = localedata.inherit(d1, d2)
+        self.assertEqual({'a': 1, 'b': 12, 'c': 3, 'd': 14}, d['x'])
+        self.assertEqual(True, isinstance(d['x'], localedata.LayeredDict))
+        self.assertEqual(True, d['y'] is d1['y'])
+        self.assertEqual({'a': 1, 'b': 2, 'c': 3}, d1['x'])
+
+    def test_inherit_with_alias_and_resolve(self):
+        alias = localedata.Alias('x')
+        d1 = {
+            'x': {'a': 1, 'b': 2, 'c': 3},
+            'y': alias
+        }
+        d2 = {
+            'x': {'a': 1, 'b': 12, 'd': 14},
+            'y': {'b': 22, 'e': 25}
+        }
+        d = localedata.inherit(d1, d2)
+        self.assertEqual((alias, {'b': 22, 'e': 25}), d['y'])
+        d = localedata.LocaleDataDict(d)
+        self.assertEqual({'a': 1, 'b': 22, 'c': 3, 'd': 14, 'e': 25},
+                         dict(d['y'].items()))
+
+    def test_resolve_nested_alias(self):
+        data = {
+            'x': {'a': {'b': 1}},
+            'y': {'a': localedata.Alias(['x', 'a']), 'c': {'d': 2}}
+        }
+        d = localedata.LocaleDataDict(data)
+        self.assertEqual(True, d['y']['a'] is data['x']['a'])
+        self.assertEqual(True, d['y']['c'] is data['y']['c'])
+        self.assertEqual(True, d['x'] is data['x'])
+
+    def test_read_does_not_modify(self):
+        alias = localedata.Alias(['x'])
+        data = {'x': {'a': 1}, 'y': alias, 'z': (alias, {'b': 2})}
+        d = localedata.LocaleDataDict(data)
+        self.assertEqual({'a': 1}, d['y'])
+        self.assertEqual({'a': 1, 'b': 2}, dict(d['z'].items()))
+        self.assertEqual(True, d['z'] is d['z'])
+        self.assertEqual(True, dict.__getitem__(d, 'y') is alias)
+        self.assertEqual({'x': {'a': 1}, 'y': alias, 'z': (alias, {'b': 2})},
+                         data)
+
+    def test_strings_are_shared(self):
+        de, es = localedata.load('de'), localedata.load('es')
+        self.assertEqual(True, de['number_symbols']['decimal'] is
+                         es['number_symbols']['decimal'])
+        de_keys = dict([(key, key) for key in de['months']['format']])
+        for key in es['months']['format']:
+            self.assertEqual(True, de_keys[key] is key)
+
+    def test_only_short_strings_are_pooled(self):
+        de = localedata.load('de')
+        self.assertEqual(True, de['number_symbols']['decimal'] in
+                         localedata._strings)
+        self.assertEqual(False, de['territories']['DE'] in
+                         localedata._strings)
+        self.assertEqual(False, de['months']['format']['wide'][9] in
+                         localedata._strings)
+
+    def test_load_resolved(self):
+        d = localedata.load_resolved('en_US')
+        self.assertEqual(True, d.base is localedata.load('en_US'))
+        self.assertEqual(True, localedata.load_resolved('en_US') is d)
+        self.assertEqual(True, d['days']['stand-alone'] is
+                         d['days']['stand-alone'])
+
+
+class LocaleDataTestCase(unittest.TestCase):
+    """Base class for tests that load locale data from a temporary directory,
+    restoring all the state of the `localedata` module afterwards.
+    """
+
+    _dicts = ('_cache', '_cache_sizes', '_cache_parents', '_cache_access',
+              '_resolved', '_strings', '_string_refs', '_cache_strings')
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.old_state = dict([(name, getattr(localedata, name)) for name in
+                               ('_dirname', '_archive', '_manifest', '_image',
+                                '_cache_limits')])
+        self.old_dicts = dict([(name, getattr(localedata, name).copy())
+                               for name in self._dicts])
+        self.old_preloaded = localedata._preloaded.copy()
+        localedata._dirname = self.dirname
+        localedata._archive = False
+        localedata._manifest = None
+        localedata._image = None
+        localedata._cache_limits = (None, None)
+        for name in self._dicts:
+            getattr(localedata, name).clear()
+        localedata._preloaded.clear()
+
+    def tearDown(self):
+        for name in ('_archive', '_image'):
+            value = getattr(localedata, name)
+            if value not in (None, False) and \
+               value is not self.old_state[name]:
+                value.close()
+        for name, value in self.old_state.items():
+            setattr(localedata, name, value)
+        for name, value in self.old_dicts.items():
+            getattr(localedata, name).clear()
+            getattr(localedata, name).update(value)
+        localedata._preloaded.clear()
+        localedata._preloaded.update(self.old_preloaded)
+        shutil.rmtree(self.dirname)
+
+    def _write(self, name, data):
+        fileobj = open(os.path.join(self.dirname, name + '.dat'), 'wb')
+        try:
+            pickle.dump(data, fileobj, 2)
+        finally:
+            fileobj.close()
+
+
+class ArchiveTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        filename = os.path.join(self.dirname, 'localedata.arc')
+        fileobj = open(filename, 'wb')
+        try:
+            writer = localedata.ArchiveWriter(fileobj)
+            writer.add('root', {
+                'languages': {'xx': u'Xish', 'yy': u'Yish'},
+                'months': {'format': {'wide': {1: u'Jan', 2: u'Feb'}}},
+                'days': {'stand-alone': localedata.Alias(['days', 'format']),
+                         'format': {'wide': {0: u'Mon'}}}
+            })
+            writer.add('xx', {
+                'languages': {'xx': u'Xisch'},
+                'days': {'stand-alone': {'narrow': {0: u'M'}}}
+            })
+            writer.add('xx_YY', {'months': {'format': {'wide': {2: u'Fev'}}}})
+            writer.finish()
+        finally:
+            fileobj.close()
+        localedata._archive = localedata.Archive(filename)
+
+    def test_exists(self):
+        self.assertEqual(True, localedata.exists('xx_YY'))
+        self.assertEqual(True, 'xx' in localedata.locale_identifiers())
+        self.assertEqual(False, 'root' in localedata.locale_identifiers())
+
+    def test_load_merges_inherited_data(self):
+        data = localedata.load('xx_YY')
+        self.assertEqual({'xx': u'Xisch', 'yy': u'Yish'}, data['languages'])
+        self.assertEqual({'format': {'wide': {1: u'Jan', 2: u'Fev'}}},
+                         data['months'])
+        self.assertEqual({'format': {'wide': {1: u'Jan', 2: u'Feb'}}},
+                         localedata.load('root')['months'])
+
+    def test_sections_are_decoded_lazily(self):
+        data = localedata.load('xx')
+        self.assertEqual(True, isinstance(dict.__getitem__(data, 'months'),
+                                          localedata.LazySection))
+        self.assertEqual(True, 'months' in data)
+        self.assertEqual(True, isinstance(dict.__getitem__(data, 'months'),
+                                          localedata.LazySection))
+        self.assertEqual({1: u'Jan', 2: u'Feb'}, data['months']['format']['wide'])
+
+    def test_resolve_alias_in_archived_section(self):
+        data = localedata.LocaleDataDict(localedata.load('xx'))
+        self.assertEqual({'wide': {0: u'Mon'}, 'narrow': {0: u'M'}},
+                         dict(data['days']['stand-alone'].items()))
+
+    def test_load_selected_sections(self):
+        data = localedata.load('xx_YY', sections=['months'])
+        self.assertEqual(True, dict.__getitem__(data, 'months')._loaded)
+        self.assertEqual(False, dict.__getitem__(data, 'days')._loaded)
+
+    def test_load_without_inheritance(self):
+        data = localedata.load('xx_YY', merge_inherited=False)
+        self.assertEqual(['months'], data.keys())
+
+
+class PreMergedTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        self.data = {
+            'languages': {'xx': u'Xisch', 'yy': u'Yish'},
+            localedata.MERGED_FROM_KEY: ['xx_YY', 'xx', 'root']
+        }
+        # Note that there are no files for the parent locales
+        self._write('xx_YY', self.data)
+
+    def test_load_pre_merged_pickle(self):
+        self.assertEqual(self.data, localedata.load('xx_YY'))
+        self.assertEqual(['xx_YY'], localedata._cache.keys())
+
+    def test_load_pre_merged_archive(self):
+        filename = os.path.join(self.dirname, 'localedata.arc')
+        fileobj = open(filename, 'wb')
+        try:
+            writer = localedata.ArchiveWriter(fileobj)
+            writer.add('xx_YY', self.data)
+            writer.finish()
+        finally:
+            fileobj.close()
+        os.remove(os.path.join(self.dirname, 'xx_YY.dat'))
+        localedata._archive = localedata.Archive(filename)
+        data = localedata.load('xx_YY')
+        self.assertEqual(self.data['languages'], data['languages'])
+        self.assertEqual(['xx_YY'], localedata._cache.keys())
+
+
+class CacheLimitTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        for name in ('root', 'xx', 'xx_YY', 'zz'):
+            self._write(name, {'languages': {name: name}})
+
+    def test_evict_least_recently_used(self):
+        localedata.set_cache_limits(max_locales=2)
+        localedata.load('xx')
+        localedata.load('zz')
+        self.assertEqual(['root', 'zz'], sorted(localedata._cache.keys()))
+        localedata.load('root')
+        localedata.load('xx', merge_inherited=False)
+        self.assertEqual(['root', 'xx'], sorted(localedata._cache.keys()))
+
+    def test_parents_are_evicted_after_children(self):
+        localedata.set_cache_limits(max_locales=2)
+        localedata.load('xx_YY')
+        self.assertEqual(['root', 'xx', 'xx_YY'],
+                         sorted(localedata._cache.keys()))
+        localedata.load('zz')
+        self.assertEqual(['root', 'zz'], sorted(localedata._cache.keys()))
+        self.assertEqual({'root': 'root', 'xx': 'xx', 'xx_YY': 'xx_YY'},
+                         dict(localedata.load('xx_YY')['languages'].items()))
+
+    def test_limit_size(self):
+        size = os.path.getsize(os.path.join(self.dirname, 'root.dat')) + \
+               os.path.getsize(os.path.join(self.dirname, 'zz.dat'))
+        localedata.load('xx')
+        localedata.load('zz')
+        localedata.set_cache_limits(max_size=size)
+        self.assertEqual(['root', 'zz'], sorted(localedata._cache.keys()))
+        self.assertEqual(size, localedata.cache_stats()['size'])
+
+    def test_preloaded_not_evicted(self):
+        localedata.preload(['xx_YY'])
+        localedata.set_cache_limits(max_locales=1)
+        localedata.load('zz')
+        self.assertEqual(['root', 'xx', 'xx_YY', 'zz'],
+                         sorted(localedata._cache.keys()))
+        localedata.set_cache_limits(max_locales=1)
+        self.assertEqual(['root', 'xx', 'xx_YY'],
+                         sorted(localedata._cache.keys()))
+
+    def test_preload_resolves_sections(self):
+        localedata.preload(['xx'], sections=['languages', 'missing'])
+        data = localedata.load_resolved('xx')
+        self.assertEqual(['languages'], data._resolved.keys())
+
+    def test_memory_report(self):
+        localedata.load('xx_YY')
+        report = localedata.memory_report()
+        self.assertEqual(['root', 'xx', 'xx_YY'], sorted(report.keys()))
+        self.assertEqual(0, report['root']['shared'])
+        languages = report['xx_YY']['sections']['languages']
+        self.assertEqual(True, languages['owned'] > 0)
+        self.assertEqual(True, languages['shared'] > 0)
+        self.assertEqual(languages['size'],
+                         languages['owned'] + languages['shared'])
+
+    def test_resolved_sections_are_not_copied(self):
+        self._write('xx', {'number_symbols': {'decimal': u'.', 'group': u','}})
+        self._write('xx_YY', {'number_symbols': {'group': u' '}})
+        data = localedata.load('xx_YY')
+        report = localedata.memory_report()
+        owned = sum([entry['owned'] for entry in report.values()])
+        resolved = localedata.load_resolved('xx_YY')
+        for key in data:
+            self.assertEqual(True, resolved[key] is data[key])
+        self.assertEqual({'decimal': u'.', 'group': u' '},
+                         resolved['number_symbols'])
+        # the sections are held once, so only the wrapper adds to the size
+        report = localedata.memory_report()
+        self.assertEqual(owned + sys.getsizeof(resolved) +
+                         sys.getsizeof(resolved._resolved),
+                         sum([entry['owned'] for entry in report.values()]))
+
+    def test_stats(self):
+        stats = localedata.cache_stats()
+        localedata.load('xx')
+        localedata.load('xx')
+        localedata.set_cache_limits(max_locales=1)
+        new_stats = localedata.cache_stats()
+        self.assertEqual(1, new_stats['hits'] - stats['hits'])
+        self.assertEqual(2, new_stats['misses'] - stats['misses'])
+        self.assertEqual(1, new_stats['evictions'] - stats['evictions'])
+        self.assertEqual(1, new_stats['locales'])
+
+
+class SelectiveLoadTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        self._write('root', {'languages': {'xx': u'Xish', 'yy': u'Yish'},
+                             'months': {'format': {'wide': {1: u'Jan'}}}})
+        self._write('xx', {'languages': {'xx': u'Xisch'},
+                           'months': {'format': {'wide': {2: u'Fev'}}}})
+
+    def test_only_selected_sections_are_loaded(self):
+        data = localedata.load('xx', sections=['languages'])
+        self.assertEqual({'xx': u'Xisch', 'yy': u'Yish'},
+                         dict(data['languages'].items()))
+        self.assertEqual(True, isinstance(dict.__getitem__(data, 'months'),
+                                          localedata.LazySection))
+        self.assertEqual(True, isinstance(
+            dict.__getitem__(localedata.load('root'), 'months'),
+            localedata.LazySection))
+
+    def test_missing_section_is_loaded_on_access(self):
+        data = localedata.load('xx', sections=['languages'])
+        self.assertEqual({1: u'Jan', 2: u'Fev'},
+                         dict(data['months']['format']['wide'].items()))
+        self.assertEqual(True, data['months'] is data['months'])
+
+    def test_cached_data_is_reused(self):
+        data = localedata.load('xx')
+        self.assertEqual(True,
+                         localedata.load('xx', sections=['months']) is data)
+
+
+class StringPoolTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        for name in ('xx', 'yy'):
+            self._write(name, {'languages': {name: u'%sish' % name},
+                               'number_symbols': {'decimal': u'.',
+                                                  'group': unicode(name * 2)}})
+
+    def _uncache(self, name):
+        localedata._cache_lock.acquire()
+        try:
+            localedata._uncache(name)
+        finally:
+            localedata._cache_lock.release()
+
+    def test_strings_are_dropped_with_the_last_locale(self):
+        xx = localedata.load('xx', merge_inherited=False)
+        yy = localedata.load('yy', merge_inherited=False)
+        self.assertEqual(True, xx['number_symbols']['decimal'] is
+                         yy['number_symbols']['decimal'])
+        self.assertEqual([u'.', u'xxxx', u'yyyy'],
+                         sorted(localedata._strings.keys()))
+        self._uncache('xx')
+        self.assertEqual([u'.', u'yyyy'], sorted(localedata._strings.keys()))
+        self._uncache('yy')
+        self.assertEqual({}, localedata._strings)
+        self.assertEqual({}, localedata._string_refs)
+
+    def test_strings_of_lazy_sections_are_tracked(self):
+        data = localedata.load('xx', merge_inherited=False,
+                               sections=['languages'])
+        self.assertEqual({}, localedata._strings)
+        self.assertEqual(u'xxxx', data['number_symbols']['group'])
+        self.assertEqual([u'.', u'xxxx'], sorted(localedata._strings.keys()))
+        self._uncache('xx')
+        self.assertEqual({}, localedata._strings)
+
+    def test_directly_pooled_strings_are_kept(self):
+        localedata.intern_strings({'decimal': u'.'})
+        localedata.load('xx', merge_inherited=False)
+        self._uncache('xx')
+        self.assertEqual([u'.'], localedata._strings.keys())
+
+
+class ManifestTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        for name in ('root', 'xx', 'xx_YY'):
+            self._write(name)
+
+    def _write(self, name, data=None):
+        if data is None:
+            data = {'languages': {name: name}}
+        LocaleDataTestCase._write(self, name, data)
+
+    def test_write_manifest(self):
+        localedata.write_manifest(self.dirname)
+        manifest = localedata._get_manifest()
+        self.assertEqual(['root', 'xx', 'xx_YY'], sorted(manifest.keys()))
+        self.assertEqual(('xx', 'root'), manifest['xx_YY'][0])
+        self.assertEqual(os.path.getsize(os.path.join(self.dirname,
+                                                      'xx_YY.dat')),
+                         manifest['xx_YY'][1])
+
+    def test_manifest_is_used(self):
+        localedata.write_manifest(self.dirname)
+        self._write('zz')
+        self.assertEqual(True, localedata.exists('xx_YY'))
+        self.assertEqual(False, localedata.exists('zz'))
+        self.assertEqual(['xx', 'xx_YY'],
+                         sorted(localedata.locale_identifiers()))
+
+    def test_directory_listing_is_cached(self):
+        self.assertEqual(True, localedata.exists('xx'))
+        os.remove(os.path.join(self.dirname, 'xx.dat'))
+        self.assertEqual(True, localedata.exists('xx'))
+        self.assertEqual(['xx', 'xx_YY'],
+                         sorted(localedata.locale_identifiers()))
+        self.assertEqual((('root',), None), localedata._get_manifest()['xx'])
+
+
+class ImageTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        self._write('root', {'languages': {'xx': u'Xish', 'yy': u'Yish'},
+                             'days': {'stand-alone':
+                                          localedata.Alias(['days', 'format']),
+                                      'format': {'wide': {0: u'Mon'}}}})
+        self._write('xx', {'languages': {'xx': u'Xisch'},
+                           'days': {'format': {'wide': {1: u'Die'}}}})
+        self.filename = os.path.join(self.dirname, 'localedata.img')
+
+    def test_load_from_image(self):
+        self.assertEqual(self.filename, localedata.use_image(self.filename))
+        self.assertEqual([], localedata._cache.keys())
+        data = localedata.load('xx')
+        self.assertEqual(True, isinstance(data, localedata.ImageDict))
+        self.assertEqual({'xx': u'Xisch', 'yy': u'Yish'},
+                         dict(data['languages'].items()))
+        self.assertEqual({0: u'Mon', 1: u'Die'},
+                         dict(data['days']['stand-alone']['wide'].items()))
+        resolved = localedata.load_resolved('xx')
+        self.assertEqual(True, resolved['days'] is resolved['days'])
+
+    def test_identical_values_are_stored_once(self):
+        localedata.use_image(self.filename)
+        root = localedata.load('root')
+        days = root['days']
+        self.assertEqual(days.offsets['format'], days.offsets['stand-alone'])
+        self.assertNotEqual(root.offsets['languages'],
+                            localedata.load('xx').offsets['languages'])
+
+    def test_existing_image_is_used(self):
+        localedata.use_image(self.filename)
+        localedata._image.close()
+        localedata._image = None
+        mtime = int(os.path.getmtime(self.filename)) + 10
+        os.utime(self.filename, (mtime, mtime))
+        localedata.use_image(self.filename)
+        self.assertEqual(mtime, int(os.path.getmtime(self.filename)))
+
+    def test_not_an_image(self):
+        fileobj = open(self.filename, 'wb')
+        try:
+            fileobj.write('foo' * 10)
+        finally:
+            fileobj.close()
+        self.assertRaises(IOError, localedata.Image, self.filename)
+
+    def _assert_replaced(self, change):
+        localedata.use_image(self.filename)
+        localedata._image.close()
+        localedata._image = None
+        inode = os.stat(self.filename).st_ino
+        change()
+        self.assertRaises(IOError, localedata.Image, self.filename)
+        mtime = int(os.path.getmtime(self.filename)) + 10
+        os.utime(self.filename, (mtime, mtime))
+        localedata.use_image(self.filename)
+        info = os.stat(self.filename)
+        self.assertNotEqual(inode, info.st_ino)
+        self.assertEqual(os.geteuid(), info.st_uid)
+        self.assertEqual(0, info.st_mode & 0022)
+        self.assertEqual(u'Xisch', localedata.load('xx')['languages']['xx'])
+
+    def test_writable_image_is_replaced(self):
+        self._assert_replaced(lambda: os.chmod(self.filename, 0666))
+
+    def test_foreign_image_is_replaced(self):
+        if os.geteuid() != 0:
+            raise unittest.SkipTest('only root can change the owner of a file')
+        self._assert_replaced(lambda: os.chown(self.filename, 12345, -1))
+
+    def _patch_mkstemp(self):
+        created = []
+        mkstemp = tempfile.mkstemp
+        def patched(*args, **kwargs):
+            fd, tmpname = mkstemp(*args, **kwargs)
+            created.append((kwargs.get('dir'), tmpname, os.fstat(fd)))
+            return fd, tmpname
+        tempfile.mkstemp = patched
+        return created, mkstemp
+
+    def test_temporary_file_is_created_exclusively(self):
+        created, mkstemp = self._patch_mkstemp()
+        try:
+            localedata.write_image(self.filename)
+        finally:
+            tempfile.mkstemp = mkstemp
+        self.assertEqual(1, len(created))
+        dirname, tmpname, info = created[0]
+        self.assertEqual(self.dirname, dirname)
+        self.assertEqual(os.geteuid(), info.st_uid)
+        self.assertEqual(0600, info.st_mode & 0777)
+        # the image is the temporary file itself, renamed into place
+        self.assertEqual(False, os.path.exists(tmpname))
+        self.assertEqual(info.st_ino, os.stat(self.filename).st_ino)
+
+    def test_temporary_file_is_removed_on_error(self):
+        created, mkstemp = self._patch_mkstemp()
+        finish = localedata.ImageWriter.finish
+        def failing_finish(self):
+            raise IOError('disk full')
+        localedata.ImageWriter.finish = failing_finish
+        try:
+            self.assertRaises(IOError, localedata.write_image, self.filename)
+        finally:
+            tempfile.mkstemp = mkstemp
+            localedata.ImageWriter.finish = finish
+        self.assertEqual(1, len(created))
+        self.assertEqual(['root.dat', 'xx.dat'],
+                         sorted(os.listdir(self.dirname)))
+
+    def test_default_image_is_private(self):
+        filename = localedata.use_image()
+        try:
+            info = os.stat(os.path.dirname(filename))
+            self.assertEqual(os.geteuid(), info.st_uid)
+            self.assertEqual(0, info.st_mode & 0077)
+        finally:
+            localedata._image.close()
+            localedata._image = None
+            os.remove(filename)
+
+
+class ConcurrentLoadTestCase(LocaleDataTestCase):
+
+    def setUp(self):
+        LocaleDataTestCase.setUp(self)
+        for name in ('root', 'xx', 'xx_YY', 'zz'):
+            self._write(name, {'languages': {name: name}})
+
+    def _load_in_threads(self, names):
+        results = []
+        start = threading.Event()
+        def run(name):
+            start.wait()
+            try:
+                results.append(localedata.load(name))
+            except IOError, e:
+                results.append(e)
+        threads = [threading.Thread(target=run, args=(name,))
+                   for name in names]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_load_same_locale(self):
+        misses = localedata.cache_stats()['misses']
+        results = self._load_in_threads(['xx_YY'] * 10)
+        self.assertEqual(3, localedata.cache_stats()['misses'] - misses)
+        for data in results:
+            self.assertEqual(True, data is localedata.load('xx_YY'))
+
+    def test_load_different_locales(self):
+        results = self._load_in_threads(['xx_YY', 'zz', 'xx', 'zz'] * 3)
+        self.assertEqual(['root', 'xx', 'xx_YY', 'zz'],
+                         sorted(localedata._cache.keys()))
+        self.assertEqual([], localedata._loading.keys())
+
+    def test_load_missing_locale(self):
+        results = self._load_in_threads(['yy'] * 5)
+        for error in results:
+            self.assertEqual(True, isinstance(error, IOError))
+        self.assertEqual([], localedata._loading.keys())
+        self.assertRaises(IOError, localedata.load, 'yy')
+
 
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(doctest.DocTestSuite(localedata))
     suite.addTest(unittest.makeSuite(MergeResolveTestCase))
+    suite.addTest(unittest.makeSuite(ArchiveTestCase))
+    suite.addTest(unittest.makeSuite(PreMergedTestCase))
+    suite.addTest(unittest.makeSuite(CacheLimitTestCase))
+    suite.addTest(unittest.makeSuite(SelectiveLoadTestCase))
+    suite.addTest(unittest.makeSuite(StringPoolTestCase))
+    suite.addTest(unittest.makeSuite(ManifestTestCase))
+    suite.addTest(unittest.makeSuite(ImageTestCase))
+    suite.addTest(unittest.makeSuite(ConcurrentLoadTestCase))
     return suite
 
 if __name__ == '__main__':
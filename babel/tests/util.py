@@ -15,10 +15,61 @@ import doctest
 import unittest
 
 from babel import util
+from babel.compat import threading
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_unbounded(self):
+        cache = util.LRUCache()
+        for idx in range(1000):
+            cache[idx] = str(idx)
+        self.assertEqual(1000, len(cache))
+        self.assertEqual('999', cache.get(999))
+
+    def test_least_recently_used_is_removed(self):
+        cache = util.LRUCache(maxsize=3)
+        for key in 'abc':
+            cache[key] = key
+        cache.get('a')
+        cache['b'] = 'B'
+        cache['d'] = 'd'
+        self.assertEqual(['a', 'b', 'd'], sorted(cache.keys()))
+        self.assertEqual('B', cache.get('b'))
+
+    def test_lower_maxsize(self):
+        cache = util.LRUCache()
+        for key in 'abcd':
+            cache[key] = key
+        cache.maxsize = 2
+        self.assertEqual(['c', 'd'], sorted(cache.keys()))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        cache['e'] = 'e'
+        self.assertEqual(['e'], cache.keys())
+
+    def test_threads(self):
+        cache = util.LRUCache(maxsize=10)
+        def run(offset):
+            for idx in range(2000):
+                key = (idx + offset) % 25
+                cache.setdefault(key, key)
+                cache.get((key + 7) % 25)
+        threads = [threading.Thread(target=run, args=(offset,))
+                   for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(10, len(cache))
+        for key in cache.keys():
+            self.assertEqual(key, cache.get(key))
+
 
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(doctest.DocTestSuite(util))
+    suite.addTest(unittest.makeSuite(LRUCacheTestCase))
     return suite
 
 if __name__ == '__main__':
@@ -21,10 +21,12 @@ import textwrap
 import time
 from itertools import izip, imap
 
+from babel.compat import threading
+
 missing = object()
 
-__all__ = ['distinct', 'pathmatch', 'relpath', 'wraptext', 'odict', 'UTC',
-           'LOCALTZ']
+__all__ = ['distinct', 'pathmatch', 'relpath', 'wraptext', 'odict',
+           'LRUCache', 'UTC', 'LOCALTZ']
 __docformat__ = 'restructuredtext en'
 
 
@@ -241,6 +243,155 @@ class odict(dict):
         return imap(self.get, self._keys)
 
 
+class LRUCache(object):
+    """Thread-safe cache that keeps the most recently used items, up to an
+    optional maximum number of items.
+    
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache.get('a')
+    1
+    >>> cache['c'] = 3
+    >>> sorted(cache.keys())
+    ['a', 'c']
+    >>> cache.get('b', 'missing')
+    'missing'
+    
+    Lookups in a cache without a maximum size do not acquire a lock.
+    """
+
+    def __init__(self, maxsize=None):
+        """Create the cache.
+        
+        :param maxsize: the maximum number of items to keep, or `None` for no
+                        limit
+        """
+        self._lock = threading.Lock()
+        self._links = {} # key -> [previous link, next link, key, value]
+        self._root = root = []
+        root[:] = [root, root, None, None]
+        self._maxsize = maxsize
+
+    def __contains__(self, key):
+        return key in self._links
+
+    def __len__(self):
+        return len(self._links)
+
+    def __setitem__(self, key, value):
+        self._lock.acquire()
+        try:
+            link = self._links.get(key)
+            if link is not None:
+                link[3] = value
+                self._move_to_end(link)
+            else:
+                self._insert(key, value)
+        finally:
+            self._lock.release()
+
+    def get(self, key, default=None):
+        """Return the item stored under the given key, marking it as the most
+        recently used item.
+        
+        :param key: the key of the item
+        :param default: the value to return if the key is not in the cache
+        """
+        link = self._links.get(key)
+        if link is None:
+            return default
+        if self._maxsize is not None:
+            self._lock.acquire()
+            try:
+                if self._links.get(key) is link:
+                    self._move_to_end(link)
+            finally:
+                self._lock.release()
+        return link[3]
+
+    def setdefault(self, key, value):
+        """Return the item stored under the given key, storing the given value
+        first if there is none.
+        
+        >>> cache = LRUCache()
+        >>> cache.setdefault('a', 1), cache.setdefault('a', 2)
+        (1, 1)
+        
+        :param key: the key of the item
+        :param value: the value to store if the key is not in the cache
+        :return: the item stored under the key
+        """
+        self._lock.acquire()
+        try:
+            link = self._links.get(key)
+            if link is not None:
+                self._move_to_end(link)
+                return link[3]
+            self._insert(key, value)
+            return value
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        """Remove all items from the cache."""
+        self._lock.acquire()
+        try:
+            self._links.clear()
+            root = self._root
+            root[:] = [root, root, None, None]
+        finally:
+            self._lock.release()
+
+    def keys(self):
+        """Return the keys of all items in the cache.
+        
+        :rtype: `list`
+        """
+        return self._links.keys()
+
+    def _get_maxsize(self):
+        return self._maxsize
+
+    def _set_maxsize(self, maxsize):
+        self._lock.acquire()
+        try:
+            self._maxsize = maxsize
+            self._trim()
+        finally:
+            self._lock.release()
+    maxsize = property(_get_maxsize, _set_maxsize, doc="""\
+        The maximum number of items to keep, or `None` for no limit.
+        
+        Lowering the maximum size removes the least recently used items.
+        
+        :type: `int`
+        """)
+
+    def _insert(self, key, value):
+        root = self._root
+        last = root[0]
+        link = [last, root, key, value]
+        last[1] = root[0] = self._links[key] = link
+        self._trim()
+
+    def _move_to_end(self, link):
+        previous, next = link[0], link[1]
+        previous[1], next[0] = next, previous
+        root = self._root
+        last = root[0]
+        link[0], link[1] = last, root
+        last[1] = root[0] = link
+
+    def _trim(self):
+        root = self._root
+        while self._maxsize is not None and len(self._links) > self._maxsize:
+            oldest = root[1]
+            next = oldest[1]
+            root[1], next[0] = next, root
+            del self._links[oldest[2]]
+
+
 try:
     relpath = os.path.relpath
 except AttributeError:
@@ -12,22 +12,12 @@
 # individuals. For the exact contribution history, see the revision
 # history and logs, available at http://babel.edgewall.org/log/.
 
-import cPickle as pickle
-import os
 from pprint import pprint
 import sys
 
-import babel
-
-dirname = os.path.join(os.path.dirname(babel.__file__))
-filename = os.path.join(dirname, 'global.dat')
-fileobj = open(filename, 'rb')
-try:
-    data = pickle.load(fileobj)
-finally:
-    fileobj.close()
+from babel.core import get_global, _get_global_data
 
 if len(sys.argv) > 1:
-    pprint(data.get(sys.argv[1]))
+    pprint(get_global(sys.argv[1]))
 else:
-    pprint(data)
+    pprint(dict(_get_global_data().items()))
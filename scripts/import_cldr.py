@@ -24,7 +24,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(sys.argv[0]), '..'))
 from babel import dates, numbers
 from babel.compat import any, ElementTree
 from babel.plural import PluralRule
-from babel.localedata import Alias
+from babel.localedata import Alias, ArchiveWriter, MERGED_FROM_KEY, \
+                             get_parent, intern_strings, merge, write_manifest
 
 parse = ElementTree.parse
 weekdays = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5,
@@ -68,7 +69,15 @@ def _translate_alias(ctxt, path):
 
 
 def main():
-    parser = OptionParser(usage='%prog path/to/cldr')
+    parser = OptionParser(usage='%prog [options] path/to/cldr')
+    parser.add_option('-a', '--archive', action='store_true', dest='archive',
+                      help='also write the locale data to a memory-mapped '
+                           'archive (babel/localedata.arc)')
+    parser.add_option('-m', '--merge-inherited', action='store_true',
+                      dest='merge_inherited',
+                      help='merge the data inherited from parent locales into '
+                           'the data written for each locale')
+    parser.set_defaults(archive=False, merge_inherited=False)
     options, args = parser.parse_args()
     if len(args) != 1:
         parser.error('incorrect number of arguments')
@@ -101,9 +110,13 @@ def main():
             if 'to' not in child.attrib: # FIXME: support old mappings
                 meta_zones[elem.attrib['type']] = child.attrib['mzone']
 
+    # The global data is written as an archive, so that every key can be
+    # decoded separately
     outfile = open(os.path.join(destdir, 'global.dat'), 'wb')
     try:
-        pickle.dump(global_data, outfile, 2)
+        writer = ArchiveWriter(outfile)
+        writer.add('global', intern_strings(global_data))
+        writer.finish()
     finally:
         outfile.close()
 
@@ -134,6 +147,15 @@ def main():
         for locale in elem.attrib['locales'].split():
             plural_rules[locale] = pr
 
+    archive = None
+    if options.archive:
+        archive_file = open(os.path.join(destdir, 'localedata.arc'), 'wb')
+        archive = ArchiveWriter(archive_file)
+
+    # the data of every locale with the inherited data merged in, only used
+    # when writing pre-merged locale data
+    merged_data = {}
+
     filenames = os.listdir(os.path.join(srcdir, 'main'))
     filenames.remove('root.xml')
     filenames.sort(lambda a,b: len(a)-len(b))
@@ -476,12 +498,38 @@ def main():
                 unit_patterns[unit_type][pattern.attrib['count']] = \
                         unicode(pattern.text)
 
+        if options.merge_inherited:
+            # Parent locales have shorter identifiers, so they have already
+            # been processed at this point
+            if stem == 'root':
+                merged, chain = {}, []
+            else:
+                parent = merged_data[get_parent(stem)]
+                merged, chain = parent.copy(), parent[MERGED_FROM_KEY]
+            merge(merged, data)
+            merged[MERGED_FROM_KEY] = [stem] + chain
+            data = merged_data[stem] = merged
+
+        # Share equal strings, so that they are only written once to the file
+        data = intern_strings(data)
+
         outfile = open(os.path.join(destdir, 'localedata', stem + '.dat'), 'wb')
         try:
             pickle.dump(data, outfile, 2)
         finally:
             outfile.close()
 
+        if archive is not None:
+            archive.add(stem, data)
+
+    if archive is not None:
+        try:
+            archive.finish()
+        finally:
+            archive_file.close()
+
+    write_manifest(os.path.join(destdir, 'localedata'))
+
 
 if __name__ == '__main__':
     main()
@@ -49,7 +49,8 @@ setup(
         'Topic :: Software Development :: Libraries :: Python Modules',
     ],
     packages = ['babel', 'babel.messages'],
-    package_data = {'babel': ['global.dat', 'localedata/*.dat']},
+    package_data = {'babel': ['global.dat', 'localedata/*.dat',
+                              'localedata/manifest.idx', 'localedata.arc']},
     test_suite = 'babel.tests.suite',
     tests_require = ['pytz'],
 